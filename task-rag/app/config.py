@@ -14,15 +14,20 @@ class Settings(BaseSettings):
     openai_api_key: str = Field(..., description="OpenAI API key for LLM and embeddings")
     model_name: str = Field(default="gpt-4-turbo-preview", description="OpenAI model name for chat completion")
     embeddings_model: str = Field(default="text-embedding-3-small", description="OpenAI embeddings model")
+    embedding_dimensions: Optional[int] = Field(default=None, ge=1, description="Shortened embedding size for text-embedding-3 models (None = model default)")
+    max_history_messages: int = Field(default=16, ge=0, description="Most recent chat messages sent to the LLM (0 = full history)")
     
     # Telegram Bot Configuration
     telegram_bot_token: str = Field(..., description="Telegram bot token from BotFather")
     telegram_webhook_secret: Optional[str] = Field(default=None, description="Secret token for webhook validation")
     telegram_webhook_url: Optional[str] = Field(default=None, description="Webhook URL for Telegram bot")
+    fastapi_base_url: str = Field(default="http://localhost:8000", description="FastAPI base URL the Telegram bot calls")
+    fastapi_ws_url: str = Field(default="ws://localhost:8000/ws/stream", description="FastAPI streaming WebSocket URL the Telegram bot connects to")
     
     # Storage Configuration
     chroma_dir: Path = Field(default=Path("data/chroma"), description="Directory for Chroma vector database")
     uploads_dir: Path = Field(default=Path("data/uploads"), description="Directory for uploaded files")
+    tasks_db_path: Optional[Path] = Field(default=Path("data/tasks.db"), description="SQLite file persisting tasks (None = in-memory only)")
     
     # Application Configuration
     app_host: str = Field(default="0.0.0.0", description="FastAPI host")
@@ -37,6 +42,8 @@ class Settings(BaseSettings):
     chunk_size: int = Field(default=1000, description="Text chunk size for document splitting")
     chunk_overlap: int = Field(default=200, description="Overlap between text chunks")
     retrieval_k: int = Field(default=5, description="Number of documents to retrieve")
+    embedding_batch_size: int = Field(default=128, ge=1, description="Text chunks embedded and stored per batch during PDF ingestion")
+    embedding_concurrency: int = Field(default=4, ge=1, description="Embedding batches in flight at once during PDF ingestion")
     
     class Config:
         """Pydantic configuration."""
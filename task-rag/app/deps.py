@@ -1,20 +1,22 @@
 """Dependency injection helpers for FastAPI."""
 
-from functools import lru_cache
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from langchain_community.vectorstores import Chroma
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.vectorstores import VectorStoreRetriever
 
 from .config import Settings, settings
 
+if TYPE_CHECKING:
+    from .graph.graph import CompiledGraph
+    from .graph.tools import ToolContext
+
 
-@lru_cache()
 def get_settings() -> Settings:
-    """Get application settings (cached)."""
+    """Get application settings (the module-level instance is built once at import)."""
     return settings
 
 
@@ -30,46 +32,33 @@ def get_llm(
     )
 
 
-def get_embeddings(
-    settings: Annotated[Settings, Depends(get_settings)]
-) -> OpenAIEmbeddings:
-    """Get OpenAI embeddings instance."""
-    return OpenAIEmbeddings(
-        model=settings.embeddings_model,
-        api_key=settings.openai_api_key,
-    )
+def get_embeddings(request: Request) -> OpenAIEmbeddings:
+    """Get the OpenAI embeddings instance created during app startup."""
+    return request.app.state.embeddings
 
 
-def get_vectorstore(
-    settings: Annotated[Settings, Depends(get_settings)],
-    embeddings: Annotated[OpenAIEmbeddings, Depends(get_embeddings)]
-) -> Chroma:
-    """Get Chroma vector store instance."""
-    # Ensure the chroma directory exists
-    settings.chroma_dir.mkdir(parents=True, exist_ok=True)
-    
-    return Chroma(
-        persist_directory=str(settings.chroma_dir),
-        embedding_function=embeddings,
-        collection_name="task_documents"
-    )
+def get_vectorstore(request: Request) -> Chroma:
+    """Get the Chroma vector store instance created during app startup."""
+    return request.app.state.vectorstore
 
 
-def get_retriever(
-    settings: Annotated[Settings, Depends(get_settings)],
-    vectorstore: Annotated[Chroma, Depends(get_vectorstore)]
-) -> VectorStoreRetriever:
-    """Get vector store retriever instance."""
-    return vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": settings.retrieval_k}
-    )
+def get_retriever(request: Request) -> VectorStoreRetriever:
+    """Get the vector store retriever instance created during app startup."""
+    return request.app.state.retriever
 
 
-def ensure_directories(
-    settings: Annotated[Settings, Depends(get_settings)]
-) -> None:
-    """Ensure required directories exist."""
+def get_graph(request: Request) -> "CompiledGraph":
+    """Get the LangGraph instance compiled during app startup."""
+    return request.app.state.graph
+
+
+def get_tool_context(request: Request) -> "ToolContext":
+    """Get the tool dependencies to pass to graph runs via their config."""
+    return request.app.state.tool_ctx
+
+
+def ensure_directories(settings: Settings) -> None:
+    """Ensure required directories exist (called once during app startup)."""
     settings.chroma_dir.mkdir(parents=True, exist_ok=True)
     settings.uploads_dir.mkdir(parents=True, exist_ok=True)
 
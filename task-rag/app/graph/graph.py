@@ -3,6 +3,7 @@
 from typing import Literal
 
 from langgraph.graph import StateGraph, END
+from langgraph.graph.graph import CompiledGraph
 from langchain_core.messages import AIMessage
 
 from .state import AgentState
@@ -29,9 +30,11 @@ def should_continue(state: AgentState) -> Literal["retriever_agent", "__end__"]:
     return "__end__"
 
 
-def build_graph() -> StateGraph:
+def build_graph() -> CompiledGraph:
     """Build and compile the LangGraph state graph.
     
+    Called once during app startup; the result is stored on ``app.state.graph``.
+    
     Returns:
         Compiled state graph ready for execution
     """
@@ -61,25 +64,3 @@ def build_graph() -> StateGraph:
     # Compile the graph
     return workflow.compile()
 
-
-# Global graph instance - will be initialized during app startup
-_compiled_graph = None
-
-
-def get_graph() -> StateGraph:
-    """Get the compiled graph instance.
-    
-    Returns:
-        The compiled state graph
-    """
-    global _compiled_graph
-    if _compiled_graph is None:
-        _compiled_graph = build_graph()
-    return _compiled_graph
-
-
-def initialize_graph() -> None:
-    """Initialize the graph during app startup."""
-    global _compiled_graph
-    _compiled_graph = build_graph()
-
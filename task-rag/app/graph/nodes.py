@@ -1,131 +1,183 @@
 """LangGraph nodes for the task management system."""
 
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Sequence
 import asyncio
 import json
 
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+import httpx
+from langchain_core.messages import BaseMessage, SystemMessage, AIMessage, ToolMessage
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_openai import ChatOpenAI
 from langchain_core.callbacks import BaseCallbackHandler
 
+from ..config import Settings
 from .state import AgentState
-from .tools import TOOLS
+from .tools import TOOLS, TOOLS_BY_NAME, retrieve_batch, retriever_tool, tool_context_from_config
 
 
-# Global WebSocket broadcaster - will be set during app initialization
-_websocket_broadcaster: Optional[Callable[[str, str], None]] = None
+# System prompt for the task manager
+SYSTEM_PROMPT = """You are a helpful AI task manager assistant. You can help users with:
 
+1. **Document Search**: Search through uploaded documents to find relevant information
+2. **Task Management**: Create, update, and list tasks based on user requests
+3. **Natural Language Processing**: Understand user intent and take appropriate actions
+
+Available tools:
+- retriever_tool: Search uploaded documents for relevant information
+- task_create_tool: Create new tasks from user descriptions
+- task_update_tool: Update task status (pending, in_progress, completed, cancelled)
+- task_list_tool: List tasks, optionally filtered by status
+
+When users ask about documents or need information from uploaded files, use the retriever_tool.
+When users want to create, update, or manage tasks, use the appropriate task tools.
+Always be helpful, clear, and provide actionable responses.
+
+If you need to use tools, call them with the appropriate parameters. The tools will return formatted results that you can use in your response to the user."""
+
+# Built once and reused; messages are not mutated by the LLM call
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+# Global LLMs with tools bound - will be initialized during app startup.
+# The streaming variant is only used when a WebSocket broadcaster is attached.
+_llm_with_tools: Optional[Runnable] = None
+_streaming_llm_with_tools: Optional[Runnable] = None
 
-def set_websocket_broadcaster(broadcaster: Callable[[str, str], None]) -> None:
-    """Set the WebSocket broadcaster for token streaming."""
-    global _websocket_broadcaster
-    _websocket_broadcaster = broadcaster
+# Number of most recent messages sent to the LLM (0 = full history)
+_max_history_messages: int = 0
+
+
+def initialize_llm(
+    settings: Settings,
+    http_client: Optional[httpx.Client] = None,
+    http_async_client: Optional[httpx.AsyncClient] = None
+) -> None:
+    """Create the shared LLM clients and bind the graph tools to them once.
+    
+    Args:
+        settings: Application settings
+        http_client: Shared HTTP client for chat requests
+        http_async_client: Shared async HTTP client for chat requests
+    """
+    global _llm_with_tools, _streaming_llm_with_tools, _max_history_messages
+    _max_history_messages = settings.max_history_messages
+    _llm_with_tools = ChatOpenAI(
+        model=settings.model_name,
+        api_key=settings.openai_api_key,
+        temperature=0.7,
+        streaming=False,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    ).bind_tools(TOOLS)
+    _streaming_llm_with_tools = ChatOpenAI(
+        model=settings.model_name,
+        api_key=settings.openai_api_key,
+        temperature=0.7,
+        streaming=True,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    ).bind_tools(TOOLS)
 
 
 class StreamingCallbackHandler(BaseCallbackHandler):
     """Callback handler for streaming tokens to WebSocket."""
     
-    def __init__(self, session_id: str):
+    # Run on the event loop rather than in an executor thread, so the
+    # broadcaster may schedule asyncio work
+    run_inline = True
+    
+    def __init__(self, session_id: str, broadcaster: Callable[[str, str], None]):
         self.session_id = session_id
+        self.broadcaster = broadcaster
     
     def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
         """Called when a new token is generated."""
-        if _websocket_broadcaster:
-            _websocket_broadcaster(self.session_id, token)
+        self.broadcaster(self.session_id, token)
 
 
-def call_llm(state: AgentState) -> Dict[str, Any]:
-    """Call the LLM with the current state and system prompt.
+def _trim_history(messages: Sequence[BaseMessage]) -> Sequence[BaseMessage]:
+    """Keep only the most recent messages for the LLM prompt.
+    
+    Tool messages at the start of the window are dropped too, because their
+    originating AI tool-call message was cut off and the API rejects them.
     
     Args:
-        state: The current agent state containing messages
+        messages: Conversation history without the system message
         
     Returns:
-        Updated state with the LLM response
+        The trimmed tail of the history
     """
-    # System prompt for the task manager
-    system_prompt = """You are a helpful AI task manager assistant. You can help users with:
-
-1. **Document Search**: Search through uploaded documents to find relevant information
-2. **Task Management**: Create, update, and list tasks based on user requests
-3. **Natural Language Processing**: Understand user intent and take appropriate actions
-
-Available tools:
-- retriever_tool: Search uploaded documents for relevant information
-- task_create_tool: Create new tasks from user descriptions
-- task_update_tool: Update task status (pending, in_progress, completed, cancelled)
-- task_list_tool: List tasks, optionally filtered by status
-
-When users ask about documents or need information from uploaded files, use the retriever_tool.
-When users want to create, update, or manage tasks, use the appropriate task tools.
-Always be helpful, clear, and provide actionable responses.
+    if not _max_history_messages or len(messages) <= _max_history_messages:
+        return messages
+    
+    start = len(messages) - _max_history_messages
+    while start < len(messages) and isinstance(messages[start], ToolMessage):
+        start += 1
+    return messages[start:]
 
-If you need to use tools, call them with the appropriate parameters. The tools will return formatted results that you can use in your response to the user."""
 
-    # Get the current messages
-    messages = list(state["messages"])
+async def call_llm(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+    """Call the LLM with the current state and system prompt.
     
-    # Add system message if not already present
-    if not messages or not isinstance(messages[0], SystemMessage):
-        messages.insert(0, SystemMessage(content=system_prompt))
+    Args:
+        state: The current agent state containing messages
+        config: The graph run config; an optional ``token_broadcaster``
+            callable in ``configurable`` receives streamed tokens
+        
+    Returns:
+        Updated state with the LLM response
+    """
+    messages = state["messages"]
     
-    # Extract session_id from the last human message metadata if available
-    session_id = "default"
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage) and hasattr(msg, 'additional_kwargs'):
-            session_id = msg.additional_kwargs.get('session_id', 'default')
-            break
+    # Send the system message plus a bounded tail of the history
+    if messages and isinstance(messages[0], SystemMessage):
+        messages = [messages[0], *_trim_history(messages[1:])]
+    else:
+        messages = [_SYSTEM_MESSAGE, *_trim_history(messages)]
     
-    # Create LLM instance with tools
-    # Note: In a real implementation, this would be injected via dependencies
-    llm = ChatOpenAI(
-        model="gpt-4-turbo-preview",
-        temperature=0.7,
-        streaming=True,
-        callbacks=[StreamingCallbackHandler(session_id)] if _websocket_broadcaster else []
-    )
+    session_id = state.get("session_id", "default")
     
-    # Bind tools to the LLM
-    llm_with_tools = llm.bind_tools(TOOLS)
+    if _llm_with_tools is None or _streaming_llm_with_tools is None:
+        raise RuntimeError("LLM not initialized")
     
-    # Invoke the LLM
-    response = llm_with_tools.invoke(messages)
+    # Only pay for SSE streaming and per-token callbacks when someone is listening
+    broadcaster = (config.get("configurable") or {}).get("token_broadcaster")
+    if broadcaster:
+        response = await _streaming_llm_with_tools.ainvoke(
+            messages,
+            config={"callbacks": [StreamingCallbackHandler(session_id, broadcaster)]}
+        )
+    else:
+        response = await _llm_with_tools.ainvoke(messages)
     
     # Return updated state
     return {"messages": [response]}
 
 
-def take_action(state: AgentState) -> Dict[str, Any]:
-    """Execute tool calls and return tool messages.
+async def take_action(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+    """Execute tool calls concurrently and return tool messages.
     
     Args:
         state: The current agent state containing messages
+        config: The graph run config carrying the tool context
         
     Returns:
         Updated state with tool execution results
     """
     # Get the last message (should be an AI message with tool calls)
-    messages = list(state["messages"])
-    last_message = messages[-1]
+    last_message = state["messages"][-1]
     
     if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
         # No tool calls to execute
         return {"messages": []}
     
-    # Execute each tool call
-    tool_messages = []
-    
-    for tool_call in last_message.tool_calls:
+    async def run_tool_call(tool_call: Dict[str, Any]) -> ToolMessage:
+        """Execute a single tool call and wrap the result in a tool message."""
         tool_name = tool_call["name"]
         tool_args = tool_call["args"]
         tool_call_id = tool_call["id"]
         
         # Find the tool function
-        tool_func = None
-        for tool in TOOLS:
-            if tool.name == tool_name:
-                tool_func = tool
-                break
+        tool_func = TOOLS_BY_NAME.get(tool_name)
         
         if tool_func is None:
             # Tool not found
@@ -133,16 +185,45 @@ def take_action(state: AgentState) -> Dict[str, Any]:
         else:
             try:
                 # Execute the tool
-                result = tool_func.invoke(tool_args)
+                result = await tool_func.ainvoke(tool_args, config=config)
             except Exception as e:
                 result = f"Error executing {tool_name}: {str(e)}"
         
         # Create tool message
-        tool_message = ToolMessage(
+        return ToolMessage(
             content=result,
             tool_call_id=tool_call_id
         )
-        tool_messages.append(tool_message)
     
-    return {"messages": tool_messages}
-
+    tool_calls = last_message.tool_calls
+    retriever_calls = [tc for tc in tool_calls if tc["name"] == retriever_tool.name]
+    
+    if not retriever_calls:
+        # Tool calls are independent, so run them concurrently
+        tool_messages = await asyncio.gather(
+            *(run_tool_call(tool_call) for tool_call in tool_calls)
+        )
+        return {"messages": list(tool_messages)}
+    
+    async def run_retriever_batch() -> List[ToolMessage]:
+        """Answer all retriever calls with one batched embedding request."""
+        tool_ctx = tool_context_from_config(config)
+        results = await retrieve_batch(
+            [tc["args"].get("query", "") for tc in retriever_calls],
+            tool_ctx.retriever,
+            tool_ctx.query_batcher
+        )
+        return [
+            ToolMessage(content=result, tool_call_id=tc["id"])
+            for tc, result in zip(retriever_calls, results)
+        ]
+    
+    other_calls = [tc for tc in tool_calls if tc["name"] != retriever_tool.name]
+    batched, *others = await asyncio.gather(
+        run_retriever_batch(),
+        *(run_tool_call(tool_call) for tool_call in other_calls)
+    )
+    
+    # Keep tool messages in the order the LLM issued the calls
+    by_id = {message.tool_call_id: message for message in (*batched, *others)}
+    return {"messages": [by_id[tc["id"]] for tc in tool_calls]}
@@ -13,4 +13,7 @@ class AgentState(TypedDict):
     # Messages are the core of the conversation state
     # The add_messages function handles message deduplication and ordering
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    
+    # Chat session the run belongs to, used to route streamed tokens
+    session_id: str
 
@@ -1,31 +1,78 @@
 """LangGraph tools for the task management system."""
 
+import asyncio
 import json
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import List, Optional
 from uuid import UUID
 
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain_core.vectorstores import VectorStoreRetriever
 
-from ..deps import get_retriever, get_settings
-from ..models.task import Task, TaskStatus
+from ..models.task import STATUS_BY_VALUE, Task
+from ..services.rag_service import QueryEmbeddingBatcher
 from ..services.task_service import TaskService
 
 
-# Global instances - these will be injected properly in the graph
-_retriever: Optional[VectorStoreRetriever] = None
-_task_service: Optional[TaskService] = None
+@dataclass(frozen=True)
+class ToolContext:
+    """Dependencies the tools need, passed per run via the graph config.
+    
+    Pass it as ``config={"configurable": {"tool_ctx": ctx}}`` when invoking
+    or streaming the graph.
+    """
+    
+    retriever: Optional[VectorStoreRetriever] = None
+    task_service: Optional[TaskService] = None
+    query_batcher: Optional[QueryEmbeddingBatcher] = None
 
 
-def set_tool_dependencies(retriever: VectorStoreRetriever, task_service: TaskService) -> None:
-    """Set dependencies for tools (called during app initialization)."""
-    global _retriever, _task_service
-    _retriever = retriever
-    _task_service = task_service
+def tool_context_from_config(config: Optional[RunnableConfig]) -> ToolContext:
+    """Get the tool context from a runnable config.
+    
+    Args:
+        config: The config of the current graph run
+        
+    Returns:
+        The configured tool context, or an empty one if none was supplied
+    """
+    configurable = (config or {}).get("configurable") or {}
+    return configurable.get("tool_ctx") or ToolContext()
+
+
+def _format_passages(docs: List[Document]) -> str:
+    """Format retrieved documents with source/page references.
+    
+    Args:
+        docs: Retrieved documents
+        
+    Returns:
+        A formatted string containing the passages with source information
+    """
+    if not docs:
+        return "No relevant documents found for your query."
+    
+    # Format the results with source information
+    results = []
+    for i, doc in enumerate(docs, 1):
+        content = doc.page_content.strip()
+        metadata = doc.metadata
+        
+        # Extract source information
+        source = metadata.get('source', 'Unknown')
+        page = metadata.get('page', 'Unknown')
+        
+        result = f"**Passage {i}:**\n{content}\n*Source: {source}, Page: {page}*"
+        results.append(result)
+    
+    return "\n\n".join(results)
 
 
 @tool
-def retriever_tool(query: str) -> str:
+def retriever_tool(query: str, *, config: RunnableConfig) -> str:
     """Search the RAG corpus and return relevant passages with source/page references.
     
     Args:
@@ -34,37 +81,59 @@ def retriever_tool(query: str) -> str:
     Returns:
         A formatted string containing relevant passages with source information
     """
-    if not _retriever:
+    retriever = tool_context_from_config(config).retriever
+    if not retriever:
         return "Error: Retriever not initialized. Please ensure documents have been ingested."
     
     try:
         # Retrieve relevant documents
-        docs = _retriever.invoke(query)
-        
-        if not docs:
-            return "No relevant documents found for your query."
-        
-        # Format the results with source information
-        results = []
-        for i, doc in enumerate(docs, 1):
-            content = doc.page_content.strip()
-            metadata = doc.metadata
-            
-            # Extract source information
-            source = metadata.get('source', 'Unknown')
-            page = metadata.get('page', 'Unknown')
-            
-            result = f"**Passage {i}:**\n{content}\n*Source: {source}, Page: {page}*"
-            results.append(result)
-        
-        return "\n\n".join(results)
+        docs = retriever.invoke(query)
+        
+        return _format_passages(docs)
     
     except Exception as e:
         return f"Error retrieving documents: {str(e)}"
 
 
+async def retrieve_batch(
+    queries: List[str],
+    retriever: Optional[VectorStoreRetriever],
+    query_batcher: Optional[QueryEmbeddingBatcher] = None
+) -> List[str]:
+    """Run several retriever_tool queries with a single embedding request.
+    
+    Args:
+        queries: The search queries, one per retriever_tool call
+        retriever: The retriever from the run's tool context
+        query_batcher: Shares the embedding request with other concurrent runs
+        
+    Returns:
+        Formatted results in the same order as the queries
+    """
+    if not retriever:
+        return ["Error: Retriever not initialized. Please ensure documents have been ingested."] * len(queries)
+    
+    try:
+        vectorstore = retriever.vectorstore
+        k = retriever.search_kwargs.get("k", 4)
+        
+        # Embed all queries in one round trip, then search by vector
+        if query_batcher is not None:
+            vectors = await query_batcher.embed(queries)
+        else:
+            vectors = await vectorstore.embeddings.aembed_documents(queries)
+        docs_per_query = await asyncio.gather(
+            *(vectorstore.asimilarity_search_by_vector(vector, k=k) for vector in vectors)
+        )
+        
+        return [_format_passages(docs) for docs in docs_per_query]
+    
+    except Exception as e:
+        return [f"Error retrieving documents: {str(e)}"] * len(queries)
+
+
 @tool
-def task_create_tool(text: str) -> str:
+def task_create_tool(text: str, *, config: RunnableConfig) -> str:
     """Create a new task from user text input.
     
     Args:
@@ -73,22 +142,23 @@ def task_create_tool(text: str) -> str:
     Returns:
         A confirmation message with the created task details
     """
-    if not _task_service:
+    task_service = tool_context_from_config(config).task_service
+    if not task_service:
         return "Error: Task service not initialized."
     
     try:
         # Parse the text to extract title and description
         # For now, we'll use the first sentence as title and rest as description
-        sentences = text.strip().split('.')
-        title = sentences[0].strip()
-        description = '. '.join(sentences[1:]).strip() if len(sentences) > 1 else None
+        title, _, rest = text.strip().partition('.')
+        title = title.strip()
+        description = rest.strip() or None
         
         # Ensure title is not empty
         if not title:
             return "Error: Cannot create task with empty title."
         
         # Create the task
-        task = _task_service.create_task(title=title, description=description)
+        task = task_service.create_task(title=title, description=description)
         
         return f"✅ Task created successfully!\n**ID:** {task.id}\n**Title:** {task.title}\n**Description:** {task.description or 'None'}\n**Status:** {task.status}"
     
@@ -97,7 +167,7 @@ def task_create_tool(text: str) -> str:
 
 
 @tool
-def task_update_tool(task_id: str, status: str) -> str:
+def task_update_tool(task_id: str, status: str, *, config: RunnableConfig) -> str:
     """Update the status of an existing task.
     
     Args:
@@ -107,7 +177,8 @@ def task_update_tool(task_id: str, status: str) -> str:
     Returns:
         A confirmation message with the updated task details
     """
-    if not _task_service:
+    task_service = tool_context_from_config(config).task_service
+    if not task_service:
         return "Error: Task service not initialized."
     
     try:
@@ -118,14 +189,12 @@ def task_update_tool(task_id: str, status: str) -> str:
             return f"Error: Invalid task ID format: {task_id}"
         
         # Validate status
-        try:
-            task_status = TaskStatus(status.lower())
-        except ValueError:
-            valid_statuses = [s.value for s in TaskStatus]
-            return f"Error: Invalid status '{status}'. Valid statuses are: {', '.join(valid_statuses)}"
+        task_status = STATUS_BY_VALUE.get(status.lower())
+        if task_status is None:
+            return f"Error: Invalid status '{status}'. Valid statuses are: {', '.join(STATUS_BY_VALUE)}"
         
         # Update the task
-        task = _task_service.update_task_status(uuid_obj, task_status)
+        task = task_service.update_task_status(uuid_obj, task_status)
         
         if not task:
             return f"Error: Task with ID {task_id} not found."
@@ -137,7 +206,7 @@ def task_update_tool(task_id: str, status: str) -> str:
 
 
 @tool
-def task_list_tool(status: Optional[str] = None) -> str:
+def task_list_tool(status: Optional[str] = None, *, config: RunnableConfig) -> str:
     """List tasks, optionally filtered by status.
     
     Args:
@@ -146,21 +215,20 @@ def task_list_tool(status: Optional[str] = None) -> str:
     Returns:
         A formatted list of tasks
     """
-    if not _task_service:
+    task_service = tool_context_from_config(config).task_service
+    if not task_service:
         return "Error: Task service not initialized."
     
     try:
         # Validate status if provided
         status_filter = None
         if status:
-            try:
-                status_filter = TaskStatus(status.lower())
-            except ValueError:
-                valid_statuses = [s.value for s in TaskStatus]
-                return f"Error: Invalid status '{status}'. Valid statuses are: {', '.join(valid_statuses)}"
+            status_filter = STATUS_BY_VALUE.get(status.lower())
+            if status_filter is None:
+                return f"Error: Invalid status '{status}'. Valid statuses are: {', '.join(STATUS_BY_VALUE)}"
         
         # Get tasks
-        tasks = _task_service.list_tasks(status=status_filter)
+        tasks = task_service.list_tasks(status=status_filter)
         
         if not tasks:
             filter_msg = f" with status '{status}'" if status else ""
@@ -189,3 +257,5 @@ TOOLS = [
     task_list_tool,
 ]
 
+# Read-only tool lookup by name for dispatching tool calls
+TOOLS_BY_NAME = MappingProxyType({t.name: t for t in TOOLS})
@@ -1,9 +1,12 @@
 """FastAPI main application with app factory and route configuration."""
 
 import logging
+import time
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from typing import AsyncGenerator
 
+import httpx
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -11,15 +14,21 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from .config import Settings
-from .deps import get_settings
+from .deps import ensure_directories, get_settings
+from .graph.graph import build_graph
+from .graph.nodes import initialize_llm
+from .graph.tools import ToolContext
 from .routes import chat, ingest, tasks
 from .services.rag_service import initialize_rag_service
 from .services.task_service import initialize_task_service
-from .utils.logging import setup_logging
+from .utils.logging import setup_logging, stop_logging
 from .ws import websocket_endpoint
 
 logger = logging.getLogger(__name__)
 
+# Connection pool limits shared by all OpenAI clients (chat and embeddings)
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -39,22 +48,51 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         setup_logging(settings)
         logger.info("Logging configured")
         
+        # Create required directories
+        ensure_directories(settings)
+        logger.info("Required directories created")
+        
+        # One pooled HTTP client pair for every OpenAI call, so chat and
+        # embedding requests reuse the same keep-alive connections
+        app.state.http_client = httpx.Client(limits=HTTP_POOL_LIMITS)
+        app.state.http_async_client = httpx.AsyncClient(limits=HTTP_POOL_LIMITS)
+        
         # Initialize services
-        rag_service = initialize_rag_service(settings)
+        rag_service = initialize_rag_service(
+            settings,
+            http_client=app.state.http_client,
+            http_async_client=app.state.http_async_client
+        )
         logger.info("RAG service initialized")
         
-        task_service = initialize_task_service()
+        task_service = initialize_task_service(settings.tasks_db_path)
         logger.info("Task service initialized")
         
-        # Create required directories
-        settings.uploads_dir.mkdir(parents=True, exist_ok=True)
-        settings.chroma_dir.mkdir(parents=True, exist_ok=True)
-        logger.info("Required directories created")
+        # Share long-lived clients across requests instead of rebuilding them per request
+        app.state.embeddings = rag_service.embeddings
+        app.state.vectorstore = rag_service.vectorstore
+        app.state.retriever = rag_service.get_retriever()
+        app.state.tool_ctx = ToolContext(
+            retriever=app.state.retriever,
+            task_service=task_service,
+            query_batcher=rag_service.query_batcher
+        )
+        
+        initialize_llm(
+            settings,
+            http_client=app.state.http_client,
+            http_async_client=app.state.http_async_client
+        )
+        logger.info("LLM client initialized")
+        
+        # Compile the LangGraph once so requests never pay the compile cost
+        app.state.graph = build_graph()
+        logger.info("LangGraph compiled")
         
         logger.info("Application startup completed successfully")
         
     except Exception as e:
-        logger.error(f"Error during application startup: {str(e)}")
+        logger.error("Error during application startup: %s", e)
         raise
     
     yield
@@ -63,11 +101,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Shutting down Task Management RAG application")
     
     try:
-        # Cleanup services if needed
+        # Close the shared HTTP connection pools
+        await app.state.http_async_client.aclose()
+        app.state.http_client.close()
+        
+        # Write any buffered task changes before exiting
+        app.state.tool_ctx.task_service.close()
         logger.info("Application shutdown completed successfully")
         
     except Exception as e:
-        logger.error(f"Error during application shutdown: {str(e)}")
+        logger.error("Error during application shutdown: %s", e)
+    
+    # Drain queued log records last so the shutdown messages are written
+    stop_logging()
 
 
 def create_app() -> FastAPI:
@@ -99,15 +145,15 @@ def create_app() -> FastAPI:
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
         """Log all HTTP requests."""
-        start_time = logger.handlers[0].formatter.formatTime(
-            logging.LogRecord("", 0, "", 0, "", (), None)
-        ) if logger.handlers else "unknown"
-        
-        logger.info(f"Request: {request.method} {request.url}")
+        start_time = time.perf_counter()
         
         response = await call_next(request)
         
-        logger.info(f"Response: {response.status_code} for {request.method} {request.url}")
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            "%s %s -> %d in %.1fms",
+            request.method, request.url.path, response.status_code, duration_ms
+        )
         
         return response
     
@@ -115,7 +161,7 @@ def create_app() -> FastAPI:
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         """Handle HTTP exceptions with proper logging."""
-        logger.warning(f"HTTP {exc.status_code}: {exc.detail} for {request.method} {request.url}")
+        logger.warning("HTTP %s: %s for %s %s", exc.status_code, exc.detail, request.method, request.url)
         
         return JSONResponse(
             status_code=exc.status_code,
@@ -129,7 +175,7 @@ def create_app() -> FastAPI:
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         """Handle request validation errors with detailed information."""
-        logger.warning(f"Validation error for {request.method} {request.url}: {exc.errors()}")
+        logger.warning("Validation error for %s %s: %s", request.method, request.url, exc.errors())
         
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -144,7 +190,7 @@ def create_app() -> FastAPI:
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
         """Handle unexpected exceptions."""
-        logger.error(f"Unexpected error for {request.method} {request.url}: {str(exc)}", exc_info=True)
+        logger.error("Unexpected error for %s %s: %s", request.method, request.url, exc, exc_info=True)
         
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -180,9 +226,7 @@ def create_app() -> FastAPI:
             
             health_status = {
                 "status": "healthy",
-                "timestamp": logger.handlers[0].formatter.formatTime(
-                    logging.LogRecord("", 0, "", 0, "", (), None)
-                ) if logger.handlers else None,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
                 "version": "1.0.0",
                 "services": {
                     "rag_service": "initialized" if rag_service else "not_initialized",
@@ -201,15 +245,13 @@ def create_app() -> FastAPI:
             return health_status
             
         except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
+            logger.error("Health check failed: %s", e)
             return JSONResponse(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 content={
                     "status": "unhealthy",
                     "error": str(e),
-                    "timestamp": logger.handlers[0].formatter.formatTime(
-                        logging.LogRecord("", 0, "", 0, "", (), None)
-                    ) if logger.handlers else None
+                    "timestamp": datetime.now(timezone.utc).isoformat()
                 }
             )
     
@@ -1,11 +1,11 @@
 """Domain models for the task management system."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TaskStatus(str, Enum):
@@ -16,6 +16,15 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Status lookup by value, avoids exception-driven TaskStatus(value) parsing
+STATUS_BY_VALUE = {s.value: s for s in TaskStatus}
+
+
+def utcnow() -> datetime:
+    """Return the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
 class Task(BaseModel):
     """Task domain model."""
     
@@ -23,20 +32,15 @@ class Task(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Task title")
     description: Optional[str] = Field(None, max_length=2000, description="Task description")
     status: TaskStatus = Field(default=TaskStatus.PENDING, description="Task status")
-    created_at: datetime = Field(default_factory=datetime.utcnow, description="Task creation timestamp")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Task last update timestamp")
+    created_at: datetime = Field(default_factory=utcnow, description="Task creation timestamp")
+    updated_at: datetime = Field(default_factory=utcnow, description="Task last update timestamp")
     
-    class Config:
-        """Pydantic configuration."""
-        use_enum_values = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-            UUID: lambda v: str(v)
-        }
+    # Pydantic v2 serializes UUID and datetime natively, no json_encoders needed
+    model_config = ConfigDict(use_enum_values=True)
     
     def update_timestamp(self) -> None:
         """Update the updated_at timestamp."""
-        self.updated_at = datetime.utcnow()
+        self.updated_at = utcnow()
     
     def mark_completed(self) -> None:
         """Mark task as completed and update timestamp."""
@@ -6,8 +6,9 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, status
 from langchain_core.messages import HumanMessage
 
-from ..deps import get_graph, get_websocket_manager
+from ..deps import get_graph, get_tool_context, get_websocket_manager
 from ..graph.graph import CompiledGraph
+from ..graph.tools import ToolContext
 from ..schemas import ChatResponse, UserMessage
 from ..ws import WebSocketManager
 
@@ -20,6 +21,7 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 async def chat(
     user_message: UserMessage,
     graph: CompiledGraph = Depends(get_graph),
+    tool_ctx: ToolContext = Depends(get_tool_context),
     ws_manager: WebSocketManager = Depends(get_websocket_manager)
 ) -> ChatResponse:
     """Process user message through LangGraph and return session ID for streaming.
@@ -27,6 +29,7 @@ async def chat(
     Args:
         user_message: User message data
         graph: Compiled LangGraph instance
+        tool_ctx: Tool dependencies for the graph run
         ws_manager: WebSocket manager for streaming
         
     Returns:
@@ -37,20 +40,14 @@ async def chat(
     """
     try:
         # Generate unique session ID
-        session_id = str(uuid4())
+        session_id = uuid4().hex
         
         logger.info(f"Starting chat session {session_id} for message: {user_message.message[:100]}...")
         
-        # Validate message
-        if not user_message.message or not user_message.message.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Message cannot be empty"
-            )
-        
         # Create initial state with user message
         initial_state = {
-            "messages": [HumanMessage(content=user_message.message.strip())]
+            "messages": [HumanMessage(content=user_message.message)],
+            "session_id": session_id
         }
         
         # Start async graph execution
@@ -58,7 +55,12 @@ async def chat(
         # For now, we just return the session ID
         
         # Store the initial state and graph execution task in the WebSocket manager
-        await ws_manager.prepare_session(session_id, initial_state, graph)
+        await ws_manager.prepare_session(
+            session_id,
+            initial_state,
+            graph,
+            config={"configurable": {"tool_ctx": tool_ctx}}
+        )
         
         logger.info(f"Chat session {session_id} prepared for streaming")
         
@@ -1,22 +1,24 @@
 """Ingestion routes for PDF and task data."""
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from ..config import Settings
 from ..deps import get_rag_service, get_settings, get_task_service
-from ..schemas import IngestResponse, TaskCreate, TaskResponse
+from ..models.task import utcnow
+from ..schemas import TASK_LIST_ADAPTER, IngestResponse, TaskCreate, TaskResponse
 from ..services.rag_service import RAGService
 from ..services.task_service import TaskService
-from ..utils.pdf import safe_save_uploaded_file
+from ..utils.pdf import cleanup_temp_files, has_pdf_signature, safe_save_uploaded_file
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/ingest", tags=["ingestion"])
+router = APIRouter(prefix="/ingest", tags=["ingestion"], default_response_class=ORJSONResponse)
 
 
 @router.post("/pdf", response_model=IngestResponse)
@@ -48,19 +50,25 @@ async def ingest_pdf(
                 detail="Only PDF files are supported"
             )
         
-        # Read file content
-        file_content = await file.read()
-        
-        if not file_content:
+        # Check the size of the spooled upload instead of reading it into memory
+        if not file.size:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Empty file uploaded"
             )
         
-        # Save file to uploads directory
+        # Reject non-PDF content by its header before anything is written to disk
+        if not has_pdf_signature(file.file):
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Uploaded file is not a PDF"
+            )
+        
+        # Stream the upload to the uploads directory off the event loop
         try:
-            file_path = safe_save_uploaded_file(
-                file_content=file_content,
+            file_path = await asyncio.to_thread(
+                safe_save_uploaded_file,
+                file_content=file.file,
                 filename=file.filename,
                 upload_dir=settings.uploads_dir
             )
@@ -71,16 +79,13 @@ async def ingest_pdf(
                 detail=f"Error saving file: {str(e)}"
             )
         
-        # Process PDF with RAG service
+        # Process PDF with RAG service, embedding batches concurrently
         try:
-            processing_result = rag_service.process_pdf(file_path)
+            processing_result = await rag_service.aprocess_pdf(file_path)
         except Exception as e:
             logger.error(f"Error processing PDF: {str(e)}")
             # Clean up the saved file if processing fails
-            try:
-                file_path.unlink()
-            except:
-                pass
+            await asyncio.to_thread(cleanup_temp_files, file_path)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error processing PDF: {str(e)}"
@@ -149,17 +154,7 @@ async def ingest_tasks(
             )
         
         # Convert to response format
-        task_responses = [
-            TaskResponse(
-                id=task.id,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                created_at=task.created_at,
-                updated_at=task.updated_at
-            )
-            for task in created_tasks
-        ]
+        task_responses = TASK_LIST_ADAPTER.validate_python(created_tasks, from_attributes=True)
         
         logger.info(f"Successfully created {len(created_tasks)} tasks")
         
@@ -179,7 +174,7 @@ async def ingest_tasks(
 async def get_ingestion_status(
     rag_service: RAGService = Depends(get_rag_service),
     task_service: TaskService = Depends(get_task_service)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Get ingestion system status.
     
     Args:
@@ -196,20 +191,18 @@ async def get_ingestion_status(
         # Get task statistics
         task_stats = task_service.get_statistics()
         
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "status": "healthy",
                 "rag_collection": collection_info,
                 "task_statistics": task_stats,
-                "timestamp": logger.handlers[0].formatter.formatTime(
-                    logging.LogRecord("", 0, "", 0, "", (), None)
-                ) if logger.handlers else None
+                "timestamp": utcnow().isoformat()
             }
         )
     
     except Exception as e:
         logger.error(f"Error getting ingestion status: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "status": "error",
@@ -6,15 +6,35 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 
 from ..deps import get_task_service
-from ..models.task import TaskStatus
-from ..schemas import TaskCreate, TaskResponse, TaskUpdate
+from ..models.task import Task, TaskStatus
+from ..schemas import TASK_LIST_ADAPTER, TaskCreate, TaskResponse, TaskUpdate
 from ..services.task_service import TaskService
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(prefix="/tasks", tags=["tasks"], default_response_class=ORJSONResponse)
+
+
+def _to_task_response(task: Task) -> TaskResponse:
+    """Build a task response without re-validating an already valid task.
+    
+    Args:
+        task: Task model from the task service
+        
+    Returns:
+        Task response
+    """
+    return TaskResponse.model_construct(
+        id=task.id,
+        title=task.title,
+        description=task.description,
+        status=TaskStatus(task.status),
+        created_at=task.created_at,
+        updated_at=task.updated_at
+    )
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -39,14 +59,7 @@ async def create_task(
         
         task = task_service.create_task_from_schema(task_data)
         
-        return TaskResponse(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            created_at=task.created_at,
-            updated_at=task.updated_at
-        )
+        return _to_task_response(task)
     
     except ValueError as e:
         logger.error(f"Validation error creating task: {str(e)}")
@@ -92,17 +105,7 @@ async def list_tasks(
             offset=offset
         )
         
-        return [
-            TaskResponse(
-                id=task.id,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                created_at=task.created_at,
-                updated_at=task.updated_at
-            )
-            for task in tasks
-        ]
+        return TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)
     
     except Exception as e:
         logger.error(f"Error listing tasks: {str(e)}")
@@ -140,14 +143,7 @@ async def get_task(
                 detail=f"Task {task_id} not found"
             )
         
-        return TaskResponse(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            created_at=task.created_at,
-            updated_at=task.updated_at
-        )
+        return _to_task_response(task)
     
     except HTTPException:
         raise
@@ -189,14 +185,7 @@ async def update_task(
                 detail=f"Task {task_id} not found"
             )
         
-        return TaskResponse(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            status=task.status,
-            created_at=task.created_at,
-            updated_at=task.updated_at
-        )
+        return _to_task_response(task)
     
     except HTTPException:
         raise
@@ -270,17 +259,7 @@ async def search_tasks(
         
         tasks = task_service.search_tasks(q, limit=limit)
         
-        return [
-            TaskResponse(
-                id=task.id,
-                title=task.title,
-                description=task.description,
-                status=task.status,
-                created_at=task.created_at,
-                updated_at=task.updated_at
-            )
-            for task in tasks
-        ]
+        return TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True)
     
     except Exception as e:
         logger.error(f"Error searching tasks: {str(e)}")
@@ -293,7 +272,7 @@ async def search_tasks(
 @router.get("/stats/", response_model=dict)
 async def get_task_statistics(
     task_service: TaskService = Depends(get_task_service)
-) -> dict:
+) -> ORJSONResponse:
     """Get task statistics.
     
     Args:
@@ -307,7 +286,9 @@ async def get_task_statistics(
         
         stats = task_service.get_statistics()
         
-        return stats
+        # orjson encodes the UUIDs and datetimes natively, so skip response
+        # model validation and jsonable_encoder
+        return ORJSONResponse(stats)
     
     except Exception as e:
         logger.error(f"Error getting task statistics: {str(e)}")
@@ -1,12 +1,12 @@
 """API request/response schemas for the task management system."""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
 
-from .models.task import TaskStatus
+from .models.task import TaskStatus, utcnow
 
 
 # Task-related schemas
@@ -32,9 +32,11 @@ class TaskResponse(BaseModel):
     created_at: datetime = Field(..., description="Task creation timestamp")
     updated_at: datetime = Field(..., description="Task last update timestamp")
     
-    class Config:
-        """Pydantic configuration."""
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Validates a whole list of Task models in one call instead of one model per row
+TASK_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
 
 
 class TaskListResponse(BaseModel):
@@ -46,7 +48,10 @@ class TaskListResponse(BaseModel):
 # Chat-related schemas
 class UserMessage(BaseModel):
     """Schema for user chat messages."""
-    message: str = Field(..., min_length=1, max_length=4000, description="User message content")
+    # Stripped during validation so blank messages fail min_length and routes get clean text
+    message: Annotated[
+        str, StringConstraints(strip_whitespace=True, min_length=1, max_length=4000)
+    ] = Field(..., description="User message content")
     session_id: Optional[str] = Field(None, description="Chat session identifier")
 
 
@@ -86,13 +91,13 @@ class WebSocketMessage(BaseModel):
     type: str = Field(..., description="Message type (token, event, error, complete)")
     content: str = Field(..., description="Message content")
     session_id: str = Field(..., description="Session identifier")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Message timestamp")
+    timestamp: datetime = Field(default_factory=utcnow, description="Message timestamp")
 
 
 # Health check schema
 class HealthResponse(BaseModel):
     """Schema for health check responses."""
     status: str = Field(default="healthy", description="Service health status")
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Health check timestamp")
+    timestamp: datetime = Field(default_factory=utcnow, description="Health check timestamp")
     version: str = Field(default="1.0.0", description="Application version")
 
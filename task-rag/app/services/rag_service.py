@@ -1,10 +1,14 @@
 """RAG service for document processing and retrieval."""
 
+import asyncio
+import hashlib
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Set, Tuple
 
-from langchain_community.document_loaders import PyPDFLoader
+import chromadb
+import httpx
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStoreRetriever
@@ -12,24 +16,136 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from ..config import Settings
-from ..utils.pdf import get_pdf_metadata, validate_pdf_file
+from ..utils.pdf import inspect_pdf_file
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of IDs fetched and deleted per Chroma call
+DELETE_BATCH_SIZE = 5000
+
+# How long queries wait to be coalesced into one embedding request, and
+# how many texts trigger an immediate request
+QUERY_BATCH_WAIT = 0.02
+QUERY_BATCH_SIZE = 32
+
+
+def content_hash_of(text: str) -> str:
+    """Hash chunk text into the ID it is stored under.
+    
+    Args:
+        text: Chunk content
+        
+    Returns:
+        Hex digest identifying the content
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class QueryEmbeddingBatcher:
+    """Coalesce concurrent query embeddings into shared embedding requests.
+    
+    Texts submitted within ``max_wait`` seconds of each other are embedded
+    together, so concurrent chats cost one round trip instead of one each.
+    Must be used from a single event loop.
+    """
+    
+    def __init__(
+        self,
+        embeddings: OpenAIEmbeddings,
+        max_wait: float = QUERY_BATCH_WAIT,
+        max_batch: int = QUERY_BATCH_SIZE
+    ):
+        """Initialize the batcher.
+        
+        Args:
+            embeddings: Embeddings client used for the batched requests
+            max_wait: Seconds to wait for more texts before sending a request
+            max_batch: Number of pending texts that sends a request at once
+        """
+        self._embeddings = embeddings
+        self._max_wait = max_wait
+        self._max_batch = max_batch
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_count = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._requests: Set[asyncio.Task] = set()
+    
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sharing the request with other concurrent callers.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            One embedding per text, in order
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_count += len(texts)
+        
+        if self._pending_count >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        """Send every pending text in one embedding request."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        pending, self._pending, self._pending_count = self._pending, [], 0
+        if pending:
+            request = asyncio.create_task(self._embed_pending(pending))
+            self._requests.add(request)
+            request.add_done_callback(self._requests.discard)
+    
+    async def _embed_pending(self, pending: List[Tuple[List[str], asyncio.Future]]) -> None:
+        """Embed a flushed batch and hand each caller its slice of the result."""
+        try:
+            vectors = await self._embeddings.aembed_documents(
+                [text for texts, _ in pending for text in texts]
+            )
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        start = 0
+        for texts, future in pending:
+            end = start + len(texts)
+            if not future.done():
+                future.set_result(vectors[start:end])
+            start = end
+
 
 class RAGService:
     """Service for RAG operations including document processing and retrieval."""
     
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        http_client: Optional[httpx.Client] = None,
+        http_async_client: Optional[httpx.AsyncClient] = None
+    ):
         """Initialize the RAG service.
         
         Args:
             settings: Application settings
+            http_client: Shared HTTP client for embedding requests
+            http_async_client: Shared async HTTP client for embedding requests
         """
         self.settings = settings
         self.embeddings = OpenAIEmbeddings(
             model=settings.embeddings_model,
-            api_key=settings.openai_api_key
+            dimensions=settings.embedding_dimensions,
+            api_key=settings.openai_api_key,
+            http_client=http_client,
+            http_async_client=http_async_client
         )
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.chunk_size,
@@ -41,15 +157,140 @@ class RAGService:
         # Ensure chroma directory exists
         settings.chroma_dir.mkdir(parents=True, exist_ok=True)
         
-        # Initialize vector store
+        # Initialize vector store; the persistent client writes changes as
+        # they are made, so no explicit persist() is needed after ingestion
+        self.chroma_client = chromadb.PersistentClient(path=str(settings.chroma_dir))
         self.vectorstore = Chroma(
-            persist_directory=str(settings.chroma_dir),
+            client=self.chroma_client,
             embedding_function=self.embeddings,
             collection_name="task_documents"
         )
         
+        # Retrievers only wrap the vector store with fixed search kwargs,
+        # so one per k can be reused across queries
+        self._retriever_cache: Dict[int, VectorStoreRetriever] = {}
+        self.query_batcher = QueryEmbeddingBatcher(self.embeddings)
+        
         logger.info(f"RAG service initialized with Chroma at {settings.chroma_dir}")
     
+    def _iter_chunk_batches(
+        self,
+        file_path: Path,
+        metadata: Dict[str, Any],
+        counts: Dict[str, int]
+    ) -> Iterator[List[Document]]:
+        """Load pages lazily and yield their chunks in embedding-sized batches.
+        
+        Memory stays bounded by the batch size rather than by the size of the PDF.
+        Each chunk gets a ``content_hash`` metadata entry, and chunks repeating
+        earlier content from the same file are skipped.
+        
+        Args:
+            file_path: Path to the PDF file
+            metadata: PDF metadata from inspect_pdf_file
+            counts: Receives the numbers of loaded pages, produced chunks and
+                skipped duplicates under ``"pages"``, ``"chunks"`` and ``"duplicates"``
+            
+        Yields:
+            Lists of at most ``settings.embedding_batch_size`` chunks
+        """
+        loader = PyMuPDFLoader(str(file_path))
+        batch_size = self.settings.embedding_batch_size
+        batch: List[Document] = []
+        seen: Set[str] = set()
+        
+        for page in loader.lazy_load():
+            counts["pages"] += 1
+            
+            # Add file metadata to each page
+            page.metadata.update({
+                'source': file_path.name,
+                'file_path': str(file_path),
+                'file_size': metadata.get('file_size', 0),
+                'total_pages': metadata.get('num_pages', 0)
+            })
+            
+            # Split the page into chunks
+            for chunk in self.text_splitter.split_documents([page]):
+                counts["chunks"] += 1
+                content_hash = content_hash_of(chunk.page_content)
+                if content_hash in seen:
+                    counts["duplicates"] += 1
+                    continue
+                seen.add(content_hash)
+                chunk.metadata['content_hash'] = content_hash
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        
+        if batch:
+            yield batch
+    
+    def _drop_stored(self, batch: List[Document]) -> List[Document]:
+        """Remove chunks whose content is already in the collection.
+        
+        Chunk IDs are content hashes, so one ID lookup finds chunks stored by
+        earlier ingestions and they are neither embedded nor written again.
+        
+        Args:
+            batch: Chunks from _iter_chunk_batches
+            
+        Returns:
+            Chunks that still need to be embedded and stored
+        """
+        hashes = [chunk.metadata['content_hash'] for chunk in batch]
+        existing = set(self.vectorstore._collection.get(ids=hashes, include=[])['ids'])
+        if not existing:
+            return batch
+        
+        return [chunk for chunk in batch if chunk.metadata['content_hash'] not in existing]
+    
+    def _processing_result(
+        self,
+        file_path: Path,
+        metadata: Dict[str, Any],
+        counts: Dict[str, int],
+        chunk_ids: List[str]
+    ) -> Dict[str, Any]:
+        """Check the ingestion outcome and build the processing result.
+        
+        Args:
+            file_path: Path to the PDF file
+            metadata: PDF metadata from inspect_pdf_file
+            counts: Processing counters from _iter_chunk_batches, plus
+                ``"stored"`` for chunks already in the collection
+            chunk_ids: Vector store IDs of the added chunks
+            
+        Returns:
+            Dictionary containing processing results
+            
+        Raises:
+            ValueError: If no pages or no chunks were produced
+        """
+        page_count = counts["pages"]
+        if not page_count:
+            raise ValueError("No content could be extracted from the PDF")
+        
+        if not counts["chunks"]:
+            raise ValueError("No text chunks could be created from the PDF")
+        
+        duplicate_count = counts["duplicates"] + counts["stored"]
+        logger.info(
+            f"Successfully processed PDF {file_path.name}: {page_count} pages, "
+            f"{len(chunk_ids)} chunks added, {duplicate_count} duplicates skipped"
+        )
+        
+        return {
+            'success': True,
+            'filename': file_path.name,
+            'document_count': page_count,
+            'chunk_count': len(chunk_ids),
+            'duplicate_count': duplicate_count,
+            'chunk_ids': chunk_ids,
+            'metadata': metadata
+        }
+    
     def process_pdf(self, file_path: Path) -> Dict[str, Any]:
         """Process a PDF file and add it to the vector store.
         
@@ -65,56 +306,106 @@ class RAGService:
         try:
             logger.info(f"Processing PDF: {file_path}")
             
-            # Validate PDF file
-            is_valid, error_msg = validate_pdf_file(file_path)
+            # Validate PDF file and read its metadata in one parse
+            is_valid, error_msg, metadata = inspect_pdf_file(file_path)
             if not is_valid:
                 raise ValueError(f"Invalid PDF file: {error_msg}")
             
-            # Get PDF metadata
-            metadata = get_pdf_metadata(file_path)
-            
-            # Load PDF documents
-            loader = PyPDFLoader(str(file_path))
-            documents = loader.load()
-            
-            if not documents:
-                raise ValueError("No content could be extracted from the PDF")
-            
-            logger.info(f"Loaded {len(documents)} pages from PDF")
-            
-            # Add file metadata to each document
-            for doc in documents:
-                doc.metadata.update({
-                    'source': file_path.name,
-                    'file_path': str(file_path),
-                    'file_size': metadata.get('file_size', 0),
-                    'total_pages': metadata.get('num_pages', 0)
-                })
-            
-            # Split documents into chunks
-            chunks = self.text_splitter.split_documents(documents)
-            
-            if not chunks:
-                raise ValueError("No text chunks could be created from the PDF")
-            
-            logger.info(f"Created {len(chunks)} text chunks")
+            # Embed and store one batch at a time
+            counts = {"pages": 0, "chunks": 0, "duplicates": 0, "stored": 0}
+            chunk_ids: List[str] = []
+            for batch in self._iter_chunk_batches(file_path, metadata, counts):
+                new_chunks = self._drop_stored(batch)
+                counts["stored"] += len(batch) - len(new_chunks)
+                if new_chunks:
+                    chunk_ids.extend(self.vectorstore.add_documents(
+                        new_chunks,
+                        ids=[chunk.metadata['content_hash'] for chunk in new_chunks]
+                    ))
+            
+            return self._processing_result(file_path, metadata, counts, chunk_ids)
+        
+        except Exception as e:
+            logger.error(f"Error processing PDF {file_path}: {str(e)}")
+            raise
+    
+    async def aprocess_pdf(self, file_path: Path) -> Dict[str, Any]:
+        """Process a PDF file with several embedding requests in flight at once.
+        
+        Pages are parsed in a worker thread while earlier batches are being
+        embedded; at most ``settings.embedding_concurrency`` batches are
+        embedded concurrently and one more is parsed ahead, which also
+        bounds memory.
+        
+        Args:
+            file_path: Path to the PDF file
             
-            # Add chunks to vector store
-            chunk_ids = self.vectorstore.add_documents(chunks)
+        Returns:
+            Dictionary containing processing results
             
-            # Persist the vector store
-            self.vectorstore.persist()
+        Raises:
+            Exception: If PDF processing fails
+        """
+        try:
+            logger.info(f"Processing PDF: {file_path}")
             
-            logger.info(f"Successfully processed PDF {file_path.name}: {len(chunks)} chunks added")
+            # Validate PDF file and read its metadata in one parse
+            is_valid, error_msg, metadata = await asyncio.to_thread(inspect_pdf_file, file_path)
+            if not is_valid:
+                raise ValueError(f"Invalid PDF file: {error_msg}")
             
-            return {
-                'success': True,
-                'filename': file_path.name,
-                'document_count': len(documents),
-                'chunk_count': len(chunks),
-                'chunk_ids': chunk_ids,
-                'metadata': metadata
-            }
+            counts = {"pages": 0, "chunks": 0, "duplicates": 0, "stored": 0}
+            batches = self._iter_chunk_batches(file_path, metadata, counts)
+            slots = asyncio.Semaphore(self.settings.embedding_concurrency)
+            write_lock = asyncio.Lock()
+            
+            async def embed_and_store(batch: List[Document]) -> List[str]:
+                """Embed one batch and write it to the collection."""
+                try:
+                    # Only the event loop touches "stored"; the parsing thread
+                    # updates the other counters
+                    new_chunks = await asyncio.to_thread(self._drop_stored, batch)
+                    counts["stored"] += len(batch) - len(new_chunks)
+                    if not new_chunks:
+                        return []
+                    batch = new_chunks
+                    
+                    texts = [chunk.page_content for chunk in batch]
+                    embeddings = await self.embeddings.aembed_documents(texts)
+                    ids = [chunk.metadata['content_hash'] for chunk in batch]
+                    
+                    # Chroma writes are serialized; only the embedding calls overlap
+                    async with write_lock:
+                        await asyncio.to_thread(
+                            self.vectorstore._collection.upsert,
+                            ids=ids,
+                            embeddings=embeddings,
+                            documents=texts,
+                            metadatas=[chunk.metadata for chunk in batch]
+                        )
+                    return ids
+                finally:
+                    slots.release()
+            
+            tasks: List[asyncio.Task] = []
+            try:
+                # Parse the next batch off the event loop before waiting for a
+                # slot, so parsing keeps going while every slot is embedding
+                while True:
+                    batch = await asyncio.to_thread(next, batches, None)
+                    if batch is None:
+                        break
+                    await slots.acquire()
+                    tasks.append(asyncio.create_task(embed_and_store(batch)))
+                
+                batch_ids = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+            
+            chunk_ids = [chunk_id for ids in batch_ids for chunk_id in ids]
+            return self._processing_result(file_path, metadata, counts, chunk_ids)
         
         except Exception as e:
             logger.error(f"Error processing PDF {file_path}: {str(e)}")
@@ -131,10 +422,15 @@ class RAGService:
         """
         search_k = k or self.settings.retrieval_k
         
-        return self.vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": search_k}
-        )
+        retriever = self._retriever_cache.get(search_k)
+        if retriever is None:
+            retriever = self.vectorstore.as_retriever(
+                search_type="similarity",
+                search_kwargs={"k": search_k}
+            )
+            self._retriever_cache[search_k] = retriever
+        
+        return retriever
     
     def search_documents(self, query: str, k: Optional[int] = None) -> List[Document]:
         """Search for documents similar to the query.
@@ -162,6 +458,32 @@ class RAGService:
             logger.error(f"Error searching documents: {str(e)}")
             raise
     
+    async def asearch_documents(self, query: str, k: Optional[int] = None) -> List[Document]:
+        """Search for documents similar to the query, batching the query embedding.
+        
+        Args:
+            query: Search query
+            k: Number of documents to retrieve
+            
+        Returns:
+            List of relevant documents
+        """
+        try:
+            search_k = k or self.settings.retrieval_k
+            
+            logger.info(f"Searching documents for query: '{query}' (k={search_k})")
+            
+            [vector] = await self.query_batcher.embed([query])
+            results = await self.vectorstore.asimilarity_search_by_vector(vector, k=search_k)
+            
+            logger.info(f"Found {len(results)} relevant documents")
+            
+            return results
+        
+        except Exception as e:
+            logger.error(f"Error searching documents: {str(e)}")
+            raise
+    
     def search_documents_with_scores(self, query: str, k: Optional[int] = None) -> List[tuple]:
         """Search for documents with similarity scores.
         
@@ -216,6 +538,35 @@ class RAGService:
                 'error': str(e)
             }
     
+    def _delete_where(self, where: Optional[Dict[str, Any]] = None) -> int:
+        """Delete matching documents in pages of DELETE_BATCH_SIZE IDs.
+        
+        Only one page of IDs is held at a time and each delete stays well
+        below SQLite's bound-parameter limit.
+        
+        Args:
+            where: Metadata filter, or None to match every document
+            
+        Returns:
+            Number of documents deleted
+        """
+        collection = self.vectorstore._collection
+        deleted = 0
+        
+        while True:
+            # Deleted IDs drop out of the results, so every page starts at offset 0
+            ids = collection.get(where=where, limit=DELETE_BATCH_SIZE, include=[])['ids']
+            if not ids:
+                break
+            
+            collection.delete(ids=ids)
+            deleted += len(ids)
+            
+            if len(ids) < DELETE_BATCH_SIZE:
+                break
+        
+        return deleted
+    
     def delete_documents_by_source(self, source: str) -> bool:
         """Delete documents by source filename.
         
@@ -228,20 +579,13 @@ class RAGService:
         try:
             logger.info(f"Deleting documents from source: {source}")
             
-            # Get collection
-            collection = self.vectorstore._collection
+            deleted = self._delete_where({"source": source})
             
-            # Query documents by source
-            results = collection.get(where={"source": source})
-            
-            if not results['ids']:
+            if not deleted:
                 logger.info(f"No documents found for source: {source}")
                 return False
             
-            # Delete documents
-            collection.delete(ids=results['ids'])
-            
-            logger.info(f"Deleted {len(results['ids'])} documents from source: {source}")
+            logger.info(f"Deleted {deleted} documents from source: {source}")
             
             return True
         
@@ -258,20 +602,13 @@ class RAGService:
         try:
             logger.warning("Clearing all documents from collection")
             
-            # Get collection
-            collection = self.vectorstore._collection
+            deleted = self._delete_where()
             
-            # Get all document IDs
-            results = collection.get()
-            
-            if not results['ids']:
+            if not deleted:
                 logger.info("Collection is already empty")
                 return True
             
-            # Delete all documents
-            collection.delete(ids=results['ids'])
-            
-            logger.info(f"Cleared {len(results['ids'])} documents from collection")
+            logger.info(f"Cleared {deleted} documents from collection")
             
             return True
         
@@ -293,16 +630,22 @@ def get_rag_service() -> Optional[RAGService]:
     return _rag_service
 
 
-def initialize_rag_service(settings: Settings) -> RAGService:
+def initialize_rag_service(
+    settings: Settings,
+    http_client: Optional[httpx.Client] = None,
+    http_async_client: Optional[httpx.AsyncClient] = None
+) -> RAGService:
     """Initialize the global RAG service instance.
     
     Args:
         settings: Application settings
+        http_client: Shared HTTP client for embedding requests
+        http_async_client: Shared async HTTP client for embedding requests
         
     Returns:
         Initialized RAG service
     """
     global _rag_service
-    _rag_service = RAGService(settings)
+    _rag_service = RAGService(settings, http_client, http_async_client)
     return _rag_service
 
@@ -1,13 +1,17 @@
 """Task service for CRUD operations and task management."""
 
+import heapq
 import logging
 from datetime import datetime, date
+from itertools import count, islice
+from pathlib import Path
 from threading import Lock
-from typing import Dict, List, Optional, UUID
-from uuid import uuid4
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
 
-from ..models.task import Task, TaskStatus
+from ..models.task import Task, TaskStatus, utcnow
 from ..schemas import TaskCreate, TaskUpdate
+from .task_store import TaskStore
 
 logger = logging.getLogger(__name__)
 
@@ -15,11 +19,113 @@ logger = logging.getLogger(__name__)
 class TaskService:
     """Service for task CRUD operations with in-memory storage."""
     
-    def __init__(self):
-        """Initialize the task service."""
-        self._tasks: Dict[UUID, Task] = {}
+    def __init__(self, task_store: Optional[TaskStore] = None):
+        """Initialize the task service.
+        
+        Args:
+            task_store: Optional SQLite store; tasks are loaded from it and
+                every change is written back in the background
+        """
+        # Tasks and indexes are keyed by UUID.int: hashing a plain int is
+        # cheaper than UUID.__hash__, which runs in Python on every lookup
+        self._tasks: Dict[int, Task] = {}  # Insertion order is creation order
+        self._status_index: Dict[TaskStatus, Set[int]] = {status: set() for status in TaskStatus}
+        self._by_date: Dict[date, Dict[int, Task]] = {}  # Creation date -> tasks in creation order
+        self._search_text: Dict[int, Tuple[str, str]] = {}  # Lowercased (title, description)
+        self._insertion_seq: Dict[int, int] = {}  # Breaks created_at ties in creation order
+        self._next_seq = count()
         self._lock = Lock()  # Thread-safe operations
-        logger.info("Task service initialized with in-memory storage")
+        
+        self._task_store: Optional[TaskStore] = None
+        if task_store is not None:
+            for task in task_store.load():
+                self._store(task)
+            # Attach after loading so restored tasks are not written back
+            self._task_store = task_store
+            logger.info(f"Task service initialized with {len(self._tasks)} persisted tasks")
+        else:
+            logger.info("Task service initialized with in-memory storage")
+    
+    def _store(self, task: Task) -> None:
+        """Add a task to storage and the status index (caller holds the lock)."""
+        key = task.id.int
+        self._tasks[key] = task
+        self._status_index[task.status].add(key)
+        self._by_date.setdefault(task.created_at.date(), {})[key] = task
+        self._insertion_seq[key] = next(self._next_seq)
+        self._index_text(task)
+        self._persist(task)
+    
+    def _persist(self, task: Task) -> None:
+        """Queue a created or changed task for the store, if any (caller holds the lock)."""
+        if self._task_store is not None:
+            self._task_store.save(task)
+    
+    def _index_text(self, task: Task) -> None:
+        """Cache the lowercased title and description used by search (caller holds the lock)."""
+        self._search_text[task.id.int] = (task.title.lower(), (task.description or "").lower())
+    
+    def _unstore(self, task_id: UUID) -> Optional[Task]:
+        """Remove a task from storage and all indexes (caller holds the lock)."""
+        key = task_id.int
+        task = self._tasks.pop(key, None)
+        if task:
+            self._status_index[task.status].discard(key)
+            self._search_text.pop(key, None)
+            self._insertion_seq.pop(key, None)
+            day = task.created_at.date()
+            day_tasks = self._by_date.get(day)
+            if day_tasks is not None:
+                day_tasks.pop(key, None)
+                if not day_tasks:
+                    del self._by_date[day]
+            if self._task_store is not None:
+                self._task_store.delete(task_id)
+        return task
+    
+    def _set_status(self, task: Task, status: TaskStatus) -> None:
+        """Change a task's status and move it in the status index (caller holds the lock)."""
+        key = task.id.int
+        self._status_index[task.status].discard(key)
+        task.status = status
+        self._status_index[status].add(key)
+    
+    def _snapshot(self) -> Tuple[Task, ...]:
+        """Copy the current tasks without taking the lock.
+        
+        Copying dict values is a single C-level operation and atomic under
+        the GIL, so readers can filter the copy while writers keep mutating.
+        
+        Returns:
+            Tasks in creation order
+        """
+        return tuple(self._tasks.values())
+    
+    @staticmethod
+    def _newest_first(
+        tasks: Dict[int, Task],
+        offset: int,
+        stop: Optional[int],
+        predicate: Optional[Callable[[Task], bool]] = None
+    ) -> List[Task]:
+        """Page through a creation-ordered mapping newest first.
+        
+        Iterates the live mapping so only ``stop`` tasks are visited; if a
+        concurrent writer resizes it mid-iteration, retries on a copy.
+        
+        Args:
+            tasks: Tasks in creation order
+            offset: Number of matching tasks to skip
+            stop: Index after the last matching task to return, or None for all
+            predicate: Optional filter applied before pagination
+            
+        Returns:
+            The requested page of tasks
+        """
+        try:
+            return list(islice(filter(predicate, reversed(tasks.values())), offset, stop))
+        except RuntimeError:
+            return list(islice(filter(predicate, reversed(tuple(tasks.values()))), offset, stop))
     
     def create_task(self, title: str, description: Optional[str] = None) -> Task:
         """Create a new task.
@@ -38,15 +144,19 @@ class TaskService:
             raise ValueError("Task title cannot be empty")
         
         with self._lock:
+            # One clock read serves both timestamps
+            now = utcnow()
             task = Task(
                 title=title.strip(),
-                description=description.strip() if description else None
+                description=description.strip() if description else None,
+                created_at=now,
+                updated_at=now
             )
             
-            self._tasks[task.id] = task
-            
-            logger.info(f"Created task {task.id}: {task.title}")
-            return task
+            self._store(task)
+        
+        logger.info(f"Created task {task.id}: {task.title}")
+        return task
     
     def create_task_from_schema(self, task_data: TaskCreate) -> Task:
         """Create a new task from schema.
@@ -71,13 +181,13 @@ class TaskService:
         Returns:
             Task if found, None otherwise
         """
-        with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
-                logger.debug(f"Retrieved task {task_id}: {task.title}")
-            else:
-                logger.debug(f"Task {task_id} not found")
-            return task
+        # Single-key dict reads are atomic under the GIL, so no lock is needed
+        task = self._tasks.get(task_id.int)
+        if task:
+            logger.debug(f"Retrieved task {task_id}: {task.title}")
+        else:
+            logger.debug(f"Task {task_id} not found")
+        return task
     
     def update_task(self, task_id: UUID, task_data: TaskUpdate) -> Optional[Task]:
         """Update a task.
@@ -89,29 +199,39 @@ class TaskService:
         Returns:
             Updated task if found, None otherwise
         """
+        # Validate before locking so the critical section only mutates state
+        title = None
+        if task_data.title is not None:
+            title = task_data.title.strip()
+            if not title:
+                raise ValueError("Task title cannot be empty")
+        
         with self._lock:
-            task = self._tasks.get(task_id)
-            if not task:
-                logger.warning(f"Task {task_id} not found for update")
-                return None
-            
-            # Update fields if provided
-            if task_data.title is not None:
-                if not task_data.title.strip():
-                    raise ValueError("Task title cannot be empty")
-                task.title = task_data.title.strip()
-            
-            if task_data.description is not None:
-                task.description = task_data.description.strip() if task_data.description else None
-            
-            if task_data.status is not None:
-                task.status = task_data.status
-            
-            # Update timestamp
-            task.update_timestamp()
-            
-            logger.info(f"Updated task {task_id}: {task.title}")
-            return task
+            task = self._tasks.get(task_id.int)
+            if task:
+                # Update fields if provided
+                if title is not None:
+                    task.title = title
+                
+                if task_data.description is not None:
+                    task.description = task_data.description.strip() if task_data.description else None
+                
+                if task_data.status is not None:
+                    self._set_status(task, task_data.status)
+                
+                self._index_text(task)
+                
+                # Update timestamp
+                task.update_timestamp()
+                self._persist(task)
+        
+        # Log outside the lock; handlers may format and write to disk
+        if not task:
+            logger.warning(f"Task {task_id} not found for update")
+            return None
+        
+        logger.info(f"Updated task {task_id}: {task.title}")
+        return task
     
     def update_task_status(self, task_id: UUID, status: TaskStatus) -> Optional[Task]:
         """Update task status.
@@ -124,17 +244,19 @@ class TaskService:
             Updated task if found, None otherwise
         """
         with self._lock:
-            task = self._tasks.get(task_id)
-            if not task:
-                logger.warning(f"Task {task_id} not found for status update")
-                return None
-            
-            old_status = task.status
-            task.status = status
-            task.update_timestamp()
-            
-            logger.info(f"Updated task {task_id} status: {old_status} -> {status}")
-            return task
+            task = self._tasks.get(task_id.int)
+            if task:
+                old_status = task.status
+                self._set_status(task, status)
+                task.update_timestamp()
+                self._persist(task)
+        
+        if not task:
+            logger.warning(f"Task {task_id} not found for status update")
+            return None
+        
+        logger.info(f"Updated task {task_id} status: {old_status} -> {status}")
+        return task
     
     def delete_task(self, task_id: UUID) -> bool:
         """Delete a task.
@@ -146,13 +268,14 @@ class TaskService:
             True if task was deleted, False if not found
         """
         with self._lock:
-            task = self._tasks.pop(task_id, None)
-            if task:
-                logger.info(f"Deleted task {task_id}: {task.title}")
-                return True
-            else:
-                logger.warning(f"Task {task_id} not found for deletion")
-                return False
+            task = self._unstore(task_id)
+        
+        if task:
+            logger.info(f"Deleted task {task_id}: {task.title}")
+            return True
+        else:
+            logger.warning(f"Task {task_id} not found for deletion")
+            return False
     
     def list_tasks(
         self,
@@ -172,32 +295,36 @@ class TaskService:
         Returns:
             List of tasks matching the filters
         """
-        with self._lock:
-            tasks = list(self._tasks.values())
-            
-            # Apply status filter
-            if status is not None:
-                tasks = [task for task in tasks if task.status == status]
-            
-            # Apply date filter
-            if date_filter is not None:
-                tasks = [
-                    task for task in tasks
-                    if task.created_at.date() == date_filter
-                ]
-            
-            # Sort by creation date (newest first)
-            tasks.sort(key=lambda t: t.created_at, reverse=True)
-            
-            # Apply pagination
-            if offset > 0:
-                tasks = tasks[offset:]
-            
-            if limit is not None:
-                tasks = tasks[:limit]
-            
-            logger.debug(f"Listed {len(tasks)} tasks (status={status}, date={date_filter})")
-            return tasks
+        stop = offset + limit if limit is not None else None
+        
+        if date_filter is not None:
+            # Tasks for one day are kept in creation order, so the day's
+            # bucket yields newest first without scanning other days
+            predicate = (lambda task: task.status == status) if status is not None else None
+            tasks = self._newest_first(self._by_date.get(date_filter, {}), offset, stop, predicate)
+        elif status is None:
+            # Tasks are stored in creation order, so iterating in reverse
+            # yields newest first without sorting
+            tasks = self._newest_first(self._tasks, offset, stop)
+        else:
+            # Only visit tasks with the requested status; when paginating,
+            # select just the newest page instead of sorting the whole set.
+            # Sets are unordered, so ties on created_at fall back to creation
+            # order to keep pages stable, as in the unfiltered listing
+            seq = self._insertion_seq
+            candidates = filter(None, map(self._tasks.get, tuple(self._status_index[status])))
+            if stop is not None:
+                candidates = heapq.nlargest(
+                    stop, candidates, key=lambda t: (t.created_at, seq.get(t.id.int, -1))
+                )
+            else:
+                candidates = sorted(
+                    candidates, key=lambda t: (t.created_at, seq.get(t.id.int, -1)), reverse=True
+                )
+            tasks = list(islice(candidates, offset, stop))
+        
+        logger.debug(f"Listed {len(tasks)} tasks (status={status}, date={date_filter})")
+        return tasks
     
     def get_task_count(self, status: Optional[TaskStatus] = None) -> int:
         """Get count of tasks.
@@ -208,11 +335,10 @@ class TaskService:
         Returns:
             Number of tasks matching the filter
         """
-        with self._lock:
-            if status is None:
-                return len(self._tasks)
-            
-            return sum(1 for task in self._tasks.values() if task.status == status)
+        if status is None:
+            return len(self._tasks)
+        
+        return len(self._status_index[status])
     
     def get_tasks_by_status(self) -> Dict[TaskStatus, int]:
         """Get task counts by status.
@@ -220,13 +346,7 @@ class TaskService:
         Returns:
             Dictionary mapping status to count
         """
-        with self._lock:
-            counts = {status: 0 for status in TaskStatus}
-            
-            for task in self._tasks.values():
-                counts[task.status] += 1
-            
-            return counts
+        return {status: len(task_ids) for status, task_ids in self._status_index.items()}
     
     def search_tasks(self, query: str, limit: Optional[int] = None) -> List[Task]:
         """Search tasks by title and description.
@@ -242,32 +362,39 @@ class TaskService:
             return []
         
         query_lower = query.strip().lower()
+        search_text = self._search_text
         
-        with self._lock:
-            matching_tasks = []
-            
-            for task in self._tasks.values():
-                # Search in title
-                if query_lower in task.title.lower():
-                    matching_tasks.append(task)
-                    continue
-                
-                # Search in description
-                if task.description and query_lower in task.description.lower():
-                    matching_tasks.append(task)
-            
-            # Sort by relevance (title matches first, then by creation date)
-            def sort_key(task):
-                title_match = query_lower in task.title.lower()
-                return (not title_match, -task.created_at.timestamp())
-            
-            matching_tasks.sort(key=sort_key)
-            
-            if limit is not None:
-                matching_tasks = matching_tasks[:limit]
-            
-            logger.debug(f"Found {len(matching_tasks)} tasks matching query: {query}")
-            return matching_tasks
+        # Relevance is title matches first, then newest first. Walking the
+        # snapshot newest first keeps each group in order without sorting,
+        # and once ``limit`` titles match no later task can make the page.
+        title_matches = []
+        description_matches = []
+        
+        for task in reversed(self._snapshot()):
+            if limit is not None and len(title_matches) >= limit:
+                break
+            
+            texts = search_text.get(task.id.int)
+            if texts is None:
+                # Deleted or not yet indexed by a concurrent writer
+                continue
+            title_lc, description_lc = texts
+            
+            # Search in title
+            if query_lower in title_lc:
+                title_matches.append(task)
+            # Search in description
+            elif query_lower in description_lc:
+                if limit is None or len(description_matches) < limit:
+                    description_matches.append(task)
+        
+        matching_tasks = title_matches + description_matches
+        
+        if limit is not None:
+            matching_tasks = matching_tasks[:limit]
+        
+        logger.debug(f"Found {len(matching_tasks)} tasks matching query: {query}")
+        return matching_tasks
     
     def bulk_create_tasks(self, tasks_data: List[TaskCreate]) -> List[Task]:
         """Create multiple tasks in bulk.
@@ -285,25 +412,37 @@ class TaskService:
             return []
         
         created_tasks = []
+        failures: List[Tuple[str, Exception]] = []
         
         with self._lock:
             for task_data in tasks_data:
                 try:
-                    task = Task(
-                        title=task_data.title.strip(),
-                        description=task_data.description.strip() if task_data.description else None
+                    # TaskCreate already enforced the field limits, so only the
+                    # stripped title needs checking before skipping validation
+                    title = task_data.title.strip()
+                    if not title:
+                        raise ValueError("Task title cannot be empty")
+                    
+                    now = utcnow()
+                    task = Task.model_construct(
+                        title=title,
+                        description=task_data.description.strip() if task_data.description else None,
+                        created_at=now,
+                        updated_at=now
                     )
                     
-                    self._tasks[task.id] = task
+                    self._store(task)
                     created_tasks.append(task)
                     
                 except Exception as e:
-                    logger.error(f"Error creating task '{task_data.title}': {str(e)}")
-                    # Continue with other tasks
-                    continue
-            
-            logger.info(f"Bulk created {len(created_tasks)} tasks")
-            return created_tasks
+                    # Logged once the lock is released; continue with other tasks
+                    failures.append((task_data.title, e))
+        
+        for title, error in failures:
+            logger.error(f"Error creating task '{title}': {str(error)}")
+        
+        logger.info(f"Bulk created {len(created_tasks)} tasks")
+        return created_tasks
     
     def clear_all_tasks(self) -> int:
         """Clear all tasks (for testing/development).
@@ -314,47 +453,62 @@ class TaskService:
         with self._lock:
             count = len(self._tasks)
             self._tasks.clear()
-            logger.warning(f"Cleared all {count} tasks")
-            return count
+            for task_ids in self._status_index.values():
+                task_ids.clear()
+            self._by_date.clear()
+            self._search_text.clear()
+            self._insertion_seq.clear()
+            if self._task_store is not None:
+                self._task_store.clear()
+        
+        logger.warning(f"Cleared all {count} tasks")
+        return count
+    
+    def close(self) -> None:
+        """Write pending changes to the task store and close it."""
+        if self._task_store is not None:
+            self._task_store.close()
     
     def get_statistics(self) -> Dict[str, any]:
         """Get task statistics.
         
+        Task IDs and timestamps are left as UUID and datetime objects; the
+        routes serialize them with orjson.
+        
         Returns:
             Dictionary containing various statistics
         """
+        # Everything below is O(1), so hold the lock briefly for a
+        # consistent view instead of copying the tasks
         with self._lock:
             total_tasks = len(self._tasks)
             status_counts = self.get_tasks_by_status()
             
-            # Calculate completion rate
-            completed_count = status_counts[TaskStatus.COMPLETED]
-            completion_rate = (completed_count / total_tasks * 100) if total_tasks > 0 else 0
-            
-            # Find oldest and newest tasks
-            oldest_task = None
-            newest_task = None
-            
-            if self._tasks:
-                tasks_by_date = sorted(self._tasks.values(), key=lambda t: t.created_at)
-                oldest_task = tasks_by_date[0]
-                newest_task = tasks_by_date[-1]
-            
-            return {
-                'total_tasks': total_tasks,
-                'status_counts': status_counts,
-                'completion_rate': round(completion_rate, 2),
-                'oldest_task': {
-                    'id': str(oldest_task.id),
-                    'title': oldest_task.title,
-                    'created_at': oldest_task.created_at.isoformat()
-                } if oldest_task else None,
-                'newest_task': {
-                    'id': str(newest_task.id),
-                    'title': newest_task.title,
-                    'created_at': newest_task.created_at.isoformat()
-                } if newest_task else None
-            }
+            # Tasks are stored in creation order, so the two ends of the
+            # dict are the oldest and newest tasks
+            oldest_task = next(iter(self._tasks.values()), None)
+            newest_task = next(reversed(self._tasks.values()), None)
+        
+        # Calculate completion rate
+        completed_count = status_counts[TaskStatus.COMPLETED]
+        completion_rate = (completed_count / total_tasks * 100) if total_tasks > 0 else 0
+        
+        return {
+            'total_tasks': total_tasks,
+            # orjson only accepts exact str keys, not str-based enum members
+            'status_counts': {status.value: count for status, count in status_counts.items()},
+            'completion_rate': round(completion_rate, 2),
+            'oldest_task': {
+                'id': oldest_task.id,
+                'title': oldest_task.title,
+                'created_at': oldest_task.created_at
+            } if oldest_task else None,
+            'newest_task': {
+                'id': newest_task.id,
+                'title': newest_task.title,
+                'created_at': newest_task.created_at
+            } if newest_task else None
+        }
 
 
 # Global task service instance - will be initialized during app startup
@@ -370,13 +524,16 @@ def get_task_service() -> Optional[TaskService]:
     return _task_service
 
 
-def initialize_task_service() -> TaskService:
+def initialize_task_service(db_path: Optional[Path] = None) -> TaskService:
     """Initialize the global task service instance.
     
+    Args:
+        db_path: SQLite file to persist tasks in (None = in-memory only)
+        
     Returns:
         Initialized task service
     """
     global _task_service
-    _task_service = TaskService()
+    _task_service = TaskService(TaskStore(db_path) if db_path is not None else None)
     return _task_service
 
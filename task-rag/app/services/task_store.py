@@ -0,0 +1,191 @@
+"""SQLite persistence for the in-memory task service."""
+
+import logging
+import sqlite3
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from ..models.task import Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# Seconds between write-behind flushes
+FLUSH_INTERVAL = 0.1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT OR REPLACE INTO tasks (id, title, description, status, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Column values of one row, in _UPSERT parameter order
+_Row = Tuple[str, str, Optional[str], str, str, str]
+
+
+class TaskStore:
+    """Write-behind SQLite store backing TaskService.
+    
+    TaskService keeps serving every read from memory; the store only records
+    which tasks changed and a background thread writes them in one WAL
+    transaction every ``flush_interval`` seconds, so mutations never wait
+    for disk.
+    """
+    
+    def __init__(self, path: Path, flush_interval: float = FLUSH_INTERVAL):
+        """Open (or create) the database and start the writer thread.
+        
+        Args:
+            path: SQLite database file
+            flush_interval: Seconds between flushes of pending changes
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Only the writer thread uses the connection after load()
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        
+        self._flush_interval = flush_interval
+        self._pending: Dict[UUID, Optional[_Row]] = {}  # None marks a deletion
+        self._clear_pending = False
+        self._pending_lock = Lock()
+        self._flush_lock = Lock()
+        self._closed = Event()
+        self._writer = Thread(target=self._run, name="task-store-writer", daemon=True)
+        self._writer.start()
+        
+        logger.info(f"Task store opened at {path}")
+    
+    def load(self) -> List[Task]:
+        """Load all stored tasks.
+        
+        Returns:
+            Tasks in creation order
+        """
+        with self._flush_lock:
+            rows = self._conn.execute(
+                "SELECT id, title, description, status, created_at, updated_at "
+                "FROM tasks ORDER BY created_at, rowid"
+            ).fetchall()
+        
+        return [
+            Task(
+                id=row[0],
+                title=row[1],
+                description=row[2],
+                status=row[3],
+                created_at=row[4],
+                updated_at=row[5]
+            )
+            for row in rows
+        ]
+    
+    def save(self, task: Task) -> None:
+        """Schedule a created or updated task to be written.
+        
+        The row is captured immediately, so callers holding the service lock
+        record a consistent state even if the task changes before the flush.
+        
+        Args:
+            task: Task to persist
+        """
+        row = (
+            str(task.id),
+            task.title,
+            task.description,
+            TaskStatus(task.status).value,
+            task.created_at.isoformat(),
+            task.updated_at.isoformat()
+        )
+        with self._pending_lock:
+            self._pending[task.id] = row
+    
+    def delete(self, task_id: UUID) -> None:
+        """Schedule a task to be deleted.
+        
+        Args:
+            task_id: Task ID
+        """
+        with self._pending_lock:
+            self._pending[task_id] = None
+    
+    def clear(self) -> None:
+        """Schedule every stored task to be deleted."""
+        with self._pending_lock:
+            self._pending.clear()
+            self._clear_pending = True
+    
+    def flush(self) -> None:
+        """Write all pending changes in a single transaction.
+        
+        If the transaction fails, the changes are queued again for the next
+        flush unless newer changes to the same tasks have been queued since.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            clear, self._clear_pending = self._clear_pending, False
+        
+        if not pending and not clear:
+            return
+        
+        upserts = [row for row in pending.values() if row is not None]
+        deletes = [(str(task_id),) for task_id, row in pending.items() if row is None]
+        
+        with self._flush_lock:
+            try:
+                self._conn.execute("BEGIN")
+                if clear:
+                    self._conn.execute("DELETE FROM tasks")
+                self._conn.executemany(_UPSERT, upserts)
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                # BEGIN itself may have failed, leaving nothing to roll back
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"Error writing {len(pending)} task changes, will retry: {str(e)}")
+                self._requeue(pending, clear)
+    
+    def _requeue(self, pending: Dict[UUID, Optional[_Row]], clear: bool) -> None:
+        """Queue changes from a failed flush behind any newer ones.
+        
+        Args:
+            pending: Changes that were not written
+            clear: Whether the failed flush was also clearing the table
+        """
+        with self._pending_lock:
+            # A clear queued since the failed flush supersedes all of it
+            if self._clear_pending:
+                return
+            self._clear_pending = clear
+            for task_id, row in pending.items():
+                self._pending.setdefault(task_id, row)
+    
+    def close(self) -> None:
+        """Stop the writer thread, flush remaining changes and close the database."""
+        self._closed.set()
+        self._writer.join()
+        self.flush()
+        self._conn.close()
+        logger.info("Task store closed")
+    
+    def _run(self) -> None:
+        """Flush pending changes periodically until the store is closed."""
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing task store: {str(e)}")
@@ -1,21 +1,252 @@
 """Telegram service for message handling and webhook management."""
 
 import asyncio
-import json
+import functools
 import logging
-from typing import Dict, Optional, Any
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
 import aiohttp
+import orjson
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramNetworkError,
+    TelegramRetryAfter
+)
 from aiogram.types import Message, WebhookInfo
+from yarl import URL
 
 from ..config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Connection pool settings for the shared session to the FastAPI backend
+HTTP_CONNECTION_LIMIT = 100
+HTTP_CONNECTION_LIMIT_PER_HOST = 32
+HTTP_KEEPALIVE_TIMEOUT = 75
+HTTP_DNS_CACHE_TTL = 300
+
+# Connection pool to api.telegram.org; keep-alive outlasts the gaps between
+# streaming edits so they reuse TLS connections
+BOT_API_CONNECTION_LIMIT = 100
+BOT_API_CONNECTION_LIMIT_PER_HOST = 64
+BOT_API_KEEPALIVE_TIMEOUT = 90
+BOT_API_DNS_CACHE_TTL = 3600
+
+# Startup connection warm-up: attempts while the backend may still be
+# starting, and the timeout (and pause) per attempt in seconds
+PREWARM_ATTEMPTS = 5
+PREWARM_TIMEOUT = 2.0
+
+# Redelivered updates are recognised for this many messages / seconds
+DEDUPE_MAX_ENTRIES = 1024
+DEDUPE_TTL = 60.0
+
+# Hashes of the last text shown in this many messages, to skip no-op edits
+EDIT_HASH_MAX_ENTRIES = 4096
+
+# Ingest results are reused for a re-sent file_id for this many files / seconds
+FILE_CACHE_MAX_ENTRIES = 256
+FILE_CACHE_TTL = 300.0
+
+# Retry policy for Telegram API calls: rate limits wait the server-given
+# delay plus jitter, network errors back off exponentially with jitter
+RETRY_MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+RETRY_JITTER = 1.0
+
+# Outbound pacing: calls per second start below Telegram's 30/s global limit,
+# grow by the increase factor on success and shrink by the decrease factor
+# when rate limited
+SHAPER_MAX_RATE = 25.0
+SHAPER_MIN_RATE = 1.0
+SHAPER_INCREASE = 1.1
+SHAPER_DECREASE = 0.5
+
+# Streaming replies: edit at most once per interval, and only after enough
+# new text arrived to be worth a rate-limited API call
+STREAM_EDIT_INTERVAL = 0.5
+STREAM_EDIT_MIN_CHARS = 40
+MAX_MESSAGE_LENGTH = 4000  # Telegram message limit with some buffer
+TRUNCATED_MESSAGE_LENGTH = MAX_MESSAGE_LENGTH - 50  # Room left for prefix and ellipsis
+
+# Fixed parts of streamed reply messages
+AI_RESPONSE_PREFIX = "🤖 *AI Response:*\n\n"
+STREAMING_SUFFIX = "..."
+ERROR_PREFIX = "❌ *Error:*\n\n"
+
+# The streaming WebSocket is shared across turns and closed after this many
+# idle seconds; heartbeats keep it alive in between
+WS_IDLE_TIMEOUT = 300.0
+WS_HEARTBEAT = 20.0
+
+T = TypeVar("T")
+
+
+def _truncate_message(text: str, length: Optional[int] = None) -> str:
+    """Shorten text to fit in a single Telegram message.
+    
+    Args:
+        text: Message text
+        length: Length of the text if the caller already tracks it
+        
+    Returns:
+        The text, cut with an ellipsis if it exceeds MAX_MESSAGE_LENGTH
+    """
+    if (len(text) if length is None else length) <= MAX_MESSAGE_LENGTH:
+        return text
+    return text[:TRUNCATED_MESSAGE_LENGTH] + "..."
+
+
+def _ingest_summary(result: Dict[str, Any], filename: str) -> str:
+    """Format a successful PDF ingest for the user.
+    
+    Args:
+        result: FastAPI ingest result
+        filename: Original filename, used if the result lacks one
+        
+    Returns:
+        Message text
+    """
+    return (
+        f"✅ *PDF Processed Successfully!*\n\n"
+        f"📄 **File:** {result.get('filename', filename)}\n"
+        f"📊 **Pages:** {result.get('document_count', 'unknown')}\n"
+        f"🔤 **Text Chunks:** {result.get('chunk_count', 'unknown')}\n\n"
+        f"💡 You can now ask questions about this document!"
+    )
+
+
+class _BotApiSession(AiohttpSession):
+    """aiogram HTTP session with a tuned connection pool for the Bot API."""
+    
+    def __init__(self, **kwargs: Any):
+        """Initialize the session.
+        
+        Args:
+            **kwargs: Passed to AiohttpSession
+        """
+        super().__init__(**kwargs)
+        # aiogram builds its TCPConnector from these arguments on first request
+        self._connector_init.update(
+            limit=BOT_API_CONNECTION_LIMIT,
+            limit_per_host=BOT_API_CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=BOT_API_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=BOT_API_DNS_CACHE_TTL
+        )
+
+
+def _telegram_call(action: str, default: Any = None):
+    """Run a TelegramService method through pacing, retries and error logging.
+    
+    The decorated method is re-run as a whole by ``_with_retry``; an API or
+    unexpected error that survives the retries is logged and turned into
+    ``default``.
+    
+    Args:
+        action: What the method does, for log messages
+        default: Value returned when the call fails
+        
+    Returns:
+        Method decorator
+    """
+    def decorator(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(method)
+        async def wrapper(self: "TelegramService", *args: Any, **kwargs: Any) -> T:
+            try:
+                return await self._with_retry(lambda: method(self, *args, **kwargs))
+            
+            except TelegramAPIError as e:
+                logger.error(f"Telegram API error {action}: {str(e)}")
+                return default
+            
+            except Exception as e:
+                logger.error(f"Unexpected error {action}: {str(e)}")
+                return default
+        
+        return wrapper
+    
+    return decorator
+
+
+class TelegramRateShaper:
+    """Adaptive token bucket pacing outbound Telegram API calls.
+    
+    Tokens refill at ``rate`` per second, up to one second's worth. Successful
+    calls raise the rate towards the ceiling; a rate limit empties the bucket,
+    cuts the rate and pauses every caller for the server-given delay, so
+    concurrent streams slow down together instead of retrying into the limit.
+    """
+    
+    def __init__(
+        self,
+        max_rate: float = SHAPER_MAX_RATE,
+        min_rate: float = SHAPER_MIN_RATE,
+        increase: float = SHAPER_INCREASE,
+        decrease: float = SHAPER_DECREASE
+    ):
+        """Initialize the shaper at its maximum rate.
+        
+        Args:
+            max_rate: Highest allowed calls per second
+            min_rate: Lowest allowed calls per second
+            increase: Rate multiplier after a successful call
+            decrease: Rate multiplier after a rate limit
+        """
+        self.rate = max_rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = max_rate
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens generated since the last refill."""
+        self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+    
+    async def acquire(self) -> None:
+        """Wait until a call may be sent and take a token for it."""
+        while True:
+            now = time.monotonic()
+            self._refill(now)
+            
+            wait = self._paused_until - now
+            if wait <= 0:
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            
+            await asyncio.sleep(wait)
+    
+    def on_result(self, ok: bool, retry_after: Optional[float] = None) -> None:
+        """Adapt the rate to the outcome of a call.
+        
+        Args:
+            ok: Whether the call went through without being rate limited
+            retry_after: Server-given delay in seconds when rate limited
+        """
+        if ok:
+            self.rate = min(self.max_rate, self.rate * self.increase)
+            return
+        
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0.0
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.info(f"Telegram rate limited, pacing calls at {self.rate:.1f}/s")
+
 
 class TelegramService:
     """Service for Telegram bot operations and message management."""
@@ -29,12 +260,272 @@ class TelegramService:
         self.settings = settings
         self.bot = Bot(
             token=settings.telegram_bot_token,
+            session=_BotApiSession(),
             default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN)
         )
-        self.fastapi_base_url = "http://localhost:8000"  # Configurable
+        
+        # Backend URLs are parsed once instead of on every request
+        base_url = URL(settings.fastapi_base_url)
+        self._health_url = base_url / "healthz"
+        self._chat_url = base_url / "chat/"
+        self._ingest_url = base_url / "ingest" / "pdf"
+        self._ws_url = URL(settings.fastapi_ws_url)
+        
+        # Shared session for FastAPI calls, created on first use so the
+        # service can be constructed outside a running event loop
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        
+        # One WebSocket carries every streamed reply; the reader task routes
+        # frames to the waiting turn by session_id (None marks a lost connection)
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._ws_reader: Optional[asyncio.Task] = None
+        self._ws_lock = asyncio.Lock()
+        self._ws_streams: Dict[str, "asyncio.Queue[Optional[Dict[str, Any]]]"] = {}
+        self._ws_idle: Optional[asyncio.TimerHandle] = None
+        
+        # Paces every Bot API call made through _with_retry
+        self._shaper = TelegramRateShaper()
+        
+        # (chat_id, message_id) -> first seen time, oldest first
+        self._processed_ids: "OrderedDict[Tuple[int, int], float]" = OrderedDict()
+        
+        # (chat_id, message_id) -> hash of the text last shown, oldest first
+        self._last_edit_hash: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        
+        # file_id -> (ingest time, ingest result), oldest first
+        self._file_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
         
         logger.info("Telegram service initialized")
     
+    def _is_duplicate(self, chat_id: int, message_id: int) -> bool:
+        """Check whether a Telegram message was already handled.
+        
+        Telegram redelivers webhook updates that are not acknowledged in
+        time; recognising them avoids running the chat or ingestion twice.
+        
+        Args:
+            chat_id: Telegram chat ID
+            message_id: ID of the triggering user message
+            
+        Returns:
+            True if the message was seen recently, False if it is new
+        """
+        key = (chat_id, message_id)
+        now = time.monotonic()
+        processed = self._processed_ids
+        
+        # Evict entries past the TTL or beyond the size bound, oldest first
+        while processed and (
+            len(processed) >= DEDUPE_MAX_ENTRIES
+            or now - next(iter(processed.values())) > DEDUPE_TTL
+        ):
+            processed.popitem(last=False)
+        
+        if key in processed:
+            logger.info(f"Skipping duplicate delivery of message {message_id} in chat {chat_id}")
+            return True
+        
+        processed[key] = now
+        return False
+    
+    def _remember_edit(self, key: Tuple[int, int], text_hash: int) -> None:
+        """Record the text a message now shows.
+        
+        Args:
+            key: (chat_id, message_id) of the edited message
+            text_hash: Hash of the text and parse mode
+        """
+        hashes = self._last_edit_hash
+        hashes.pop(key, None)
+        hashes[key] = text_hash
+        if len(hashes) > EDIT_HASH_MAX_ENTRIES:
+            hashes.popitem(last=False)
+    
+    def _cached_ingest(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a recent ingest result for a Telegram file.
+        
+        Args:
+            file_id: Telegram file ID
+            
+        Returns:
+            The FastAPI ingest result, or None if the file was not ingested recently
+        """
+        now = time.monotonic()
+        cache = self._file_cache
+        
+        # Evict entries past the TTL, oldest first
+        while cache and now - next(iter(cache.values()))[0] > FILE_CACHE_TTL:
+            cache.popitem(last=False)
+        
+        entry = cache.get(file_id)
+        return entry[1] if entry else None
+    
+    def _remember_ingest(self, file_id: str, result: Dict[str, Any]) -> None:
+        """Record a successful ingest so a re-sent file skips the download.
+        
+        Args:
+            file_id: Telegram file ID
+            result: FastAPI ingest result
+        """
+        cache = self._file_cache
+        cache.pop(file_id, None)
+        cache[file_id] = (time.monotonic(), result)
+        while len(cache) > FILE_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+    
+    def _http_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session to the FastAPI backend.
+        
+        Reusing one session keeps its connection pool and keep-alive sockets,
+        so requests skip the TCP handshake and DNS lookup.
+        
+        Returns:
+            The shared client session
+        """
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_CONNECTION_LIMIT,
+                    limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+                    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+                    enable_cleanup_closed=True
+                )
+            )
+        return self._http
+    
+    async def prewarm(self) -> bool:
+        """Open a pooled connection to the backend before the first message.
+        
+        The health check fills the connector's DNS cache and leaves a
+        keep-alive socket in the pool, so the first chat skips both.
+        
+        Returns:
+            True if the backend answered
+        """
+        timeout = aiohttp.ClientTimeout(total=PREWARM_TIMEOUT)
+        
+        for attempt in range(PREWARM_ATTEMPTS):
+            try:
+                async with self._http_session().get(self._health_url, timeout=timeout) as response:
+                    await response.read()
+                logger.info(f"Connection to FastAPI backend warmed up after {attempt + 1} attempt(s)")
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # The backend may still be starting up
+                await asyncio.sleep(PREWARM_TIMEOUT)
+        
+        logger.warning("Could not warm up the connection to the FastAPI backend")
+        return False
+    
+    async def _stream_socket(self) -> aiohttp.ClientWebSocketResponse:
+        """Get the shared streaming WebSocket, connecting if needed.
+        
+        Returns:
+            The open WebSocket connection
+        """
+        async with self._ws_lock:
+            if self._ws is None or self._ws.closed:
+                self._ws = await self._http_session().ws_connect(
+                    self._ws_url,
+                    heartbeat=WS_HEARTBEAT
+                )
+                self._ws_reader = asyncio.create_task(self._read_socket(self._ws))
+            return self._ws
+    
+    async def _read_socket(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Route frames from the shared WebSocket to their streams.
+        
+        Args:
+            ws: Shared WebSocket connection
+        """
+        # Bound once; this loop handles every streamed token
+        text_type, error_type = aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.ERROR
+        loads = orjson.loads
+        streams = self._ws_streams
+        
+        try:
+            async for msg in ws:
+                if msg.type is text_type:
+                    try:
+                        data = loads(msg.data)
+                    except orjson.JSONDecodeError:
+                        logger.warning(f"Invalid JSON from WebSocket: {msg.data}")
+                        continue
+                    
+                    if not isinstance(data, dict):
+                        logger.warning(f"Ignoring non-object WebSocket frame: {msg.data}")
+                        continue
+                    
+                    stream = streams.get(data.get('session_id'))
+                    if stream is not None:
+                        stream.put_nowait(data)
+                
+                elif msg.type is error_type:
+                    logger.error(f"WebSocket error: {ws.exception()}")
+                    break
+        finally:
+            # However the reader stops, the socket can no longer route frames,
+            # so make the next turn open a fresh one
+            if self._ws is ws:
+                self._ws = None
+            
+            # Wake every waiting turn; their sessions died with the connection
+            for stream in self._ws_streams.values():
+                stream.put_nowait(None)
+            
+            if not ws.closed:
+                await ws.close()
+    
+    def _schedule_idle_close(self) -> None:
+        """Close the shared WebSocket once no turn has used it for a while."""
+        if self._ws_idle is not None:
+            self._ws_idle.cancel()
+            self._ws_idle = None
+        
+        if not self._ws_streams and self._ws is not None and not self._ws.closed:
+            ws = self._ws
+            self._ws_idle = asyncio.get_running_loop().call_later(
+                WS_IDLE_TIMEOUT,
+                lambda: asyncio.create_task(ws.close())
+            )
+    
+    async def _with_retry(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run a paced Telegram API call, retrying rate limits and network errors.
+        
+        Args:
+            call: Creates a fresh awaitable for each attempt
+            
+        Returns:
+            Result of the first successful attempt
+            
+        Raises:
+            TelegramRetryAfter: If still rate limited after the last attempt
+            TelegramNetworkError: If the network still fails after the last attempt
+        """
+        for attempt in range(RETRY_MAX_ATTEMPTS):
+            await self._shaper.acquire()
+            try:
+                result = await call()
+            except TelegramRetryAfter as e:
+                self._shaper.on_result(False, e.retry_after)
+                if attempt == RETRY_MAX_ATTEMPTS - 1:
+                    raise
+                delay = e.retry_after + random.uniform(0, min(RETRY_JITTER, e.retry_after * 0.1))
+                logger.warning(f"Rate limited, retry after {delay:.2f} seconds")
+            except TelegramNetworkError as e:
+                if attempt == RETRY_MAX_ATTEMPTS - 1:
+                    raise
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, RETRY_JITTER)
+                logger.warning(f"Telegram network error, retry after {delay:.2f} seconds: {str(e)}")
+            else:
+                self._shaper.on_result(True)
+                return result
+            
+            await asyncio.sleep(delay)
+    
+    @_telegram_call("sending message")
     async def send_message(
         self, 
         chat_id: int, 
@@ -53,30 +544,17 @@ class TelegramService:
         Returns:
             Sent message or None if failed
         """
-        try:
-            message = await self.bot.send_message(
-                chat_id=chat_id,
-                text=text,
-                parse_mode=parse_mode,
-                disable_web_page_preview=disable_web_page_preview
-            )
-            
-            logger.debug(f"Message sent to chat {chat_id}: {text[:50]}...")
-            return message
-        
-        except TelegramRetryAfter as e:
-            logger.warning(f"Rate limited, retry after {e.retry_after} seconds")
-            await asyncio.sleep(e.retry_after)
-            return await self.send_message(chat_id, text, parse_mode, disable_web_page_preview)
-        
-        except TelegramAPIError as e:
-            logger.error(f"Telegram API error sending message: {str(e)}")
-            return None
+        message = await self.bot.send_message(
+            chat_id=chat_id,
+            text=text,
+            parse_mode=parse_mode,
+            disable_web_page_preview=disable_web_page_preview
+        )
         
-        except Exception as e:
-            logger.error(f"Unexpected error sending message: {str(e)}")
-            return None
+        logger.debug(f"Message sent to chat {chat_id}: {text[:50]}...")
+        return message
     
+    @_telegram_call("editing message", default=False)
     async def edit_message(
         self, 
         chat_id: int, 
@@ -97,6 +575,12 @@ class TelegramService:
         Returns:
             True if message was edited successfully
         """
+        # Telegram rejects an edit that changes nothing; skip the round trip
+        key = (chat_id, message_id)
+        text_hash = hash((text, parse_mode))
+        if self._last_edit_hash.get(key) == text_hash:
+            return True
+        
         try:
             await self.bot.edit_message_text(
                 chat_id=chat_id,
@@ -105,31 +589,22 @@ class TelegramService:
                 parse_mode=parse_mode,
                 disable_web_page_preview=disable_web_page_preview
             )
-            
-            logger.debug(f"Message {message_id} edited in chat {chat_id}")
-            return True
-        
-        except TelegramRetryAfter as e:
-            logger.warning(f"Rate limited, retry after {e.retry_after} seconds")
-            await asyncio.sleep(e.retry_after)
-            return await self.edit_message(chat_id, message_id, text, parse_mode, disable_web_page_preview)
-        
-        except TelegramAPIError as e:
-            # Handle common edit errors
-            if "message is not modified" in str(e).lower():
+        except TelegramBadRequest as e:
+            # Handle common edit errors; Telegram's descriptions are lowercase
+            if "message is not modified" in e.message:
                 logger.debug(f"Message {message_id} content unchanged, skipping edit")
+                self._remember_edit(key, text_hash)
                 return True
-            elif "message to edit not found" in str(e).lower():
+            elif "message to edit not found" in e.message:
                 logger.warning(f"Message {message_id} not found for editing")
                 return False
-            else:
-                logger.error(f"Telegram API error editing message: {str(e)}")
-                return False
+            raise
         
-        except Exception as e:
-            logger.error(f"Unexpected error editing message: {str(e)}")
-            return False
+        logger.debug(f"Message {message_id} edited in chat {chat_id}")
+        self._remember_edit(key, text_hash)
+        return True
     
+    @_telegram_call("deleting message", default=False)
     async def delete_message(self, chat_id: int, message_id: int) -> bool:
         """Delete a Telegram message.
         
@@ -140,20 +615,12 @@ class TelegramService:
         Returns:
             True if message was deleted successfully
         """
-        try:
-            await self.bot.delete_message(chat_id=chat_id, message_id=message_id)
-            
-            logger.debug(f"Message {message_id} deleted from chat {chat_id}")
-            return True
+        await self.bot.delete_message(chat_id=chat_id, message_id=message_id)
         
-        except TelegramAPIError as e:
-            logger.error(f"Telegram API error deleting message: {str(e)}")
-            return False
-        
-        except Exception as e:
-            logger.error(f"Unexpected error deleting message: {str(e)}")
-            return False
+        logger.debug(f"Message {message_id} deleted from chat {chat_id}")
+        return True
     
+    @_telegram_call("setting webhook", default=False)
     async def set_webhook(self, webhook_url: str, secret_token: Optional[str] = None) -> bool:
         """Set webhook for the bot.
         
@@ -164,66 +631,42 @@ class TelegramService:
         Returns:
             True if webhook was set successfully
         """
-        try:
-            await self.bot.set_webhook(
-                url=webhook_url,
-                secret_token=secret_token or self.settings.telegram_webhook_secret
-            )
-            
-            logger.info(f"Webhook set to: {webhook_url}")
-            return True
-        
-        except TelegramAPIError as e:
-            logger.error(f"Telegram API error setting webhook: {str(e)}")
-            return False
+        await self.bot.set_webhook(
+            url=webhook_url,
+            secret_token=secret_token or self.settings.telegram_webhook_secret
+        )
         
-        except Exception as e:
-            logger.error(f"Unexpected error setting webhook: {str(e)}")
-            return False
+        logger.info(f"Webhook set to: {webhook_url}")
+        return True
     
+    @_telegram_call("deleting webhook", default=False)
     async def delete_webhook(self) -> bool:
         """Delete webhook for the bot.
         
         Returns:
             True if webhook was deleted successfully
         """
-        try:
-            await self.bot.delete_webhook()
-            logger.info("Webhook deleted")
-            return True
-        
-        except TelegramAPIError as e:
-            logger.error(f"Telegram API error deleting webhook: {str(e)}")
-            return False
-        
-        except Exception as e:
-            logger.error(f"Unexpected error deleting webhook: {str(e)}")
-            return False
+        await self.bot.delete_webhook()
+        logger.info("Webhook deleted")
+        return True
     
+    @_telegram_call("getting webhook info")
     async def get_webhook_info(self) -> Optional[WebhookInfo]:
         """Get current webhook information.
         
         Returns:
             Webhook info or None if error
         """
-        try:
-            webhook_info = await self.bot.get_webhook_info()
-            logger.debug(f"Webhook info: {webhook_info}")
-            return webhook_info
-        
-        except TelegramAPIError as e:
-            logger.error(f"Telegram API error getting webhook info: {str(e)}")
-            return None
-        
-        except Exception as e:
-            logger.error(f"Unexpected error getting webhook info: {str(e)}")
-            return None
+        webhook_info = await self.bot.get_webhook_info()
+        logger.debug(f"Webhook info: {webhook_info}")
+        return webhook_info
     
     async def handle_streaming_chat(
         self, 
         chat_id: int, 
         user_message: str,
-        initial_message_id: Optional[int] = None
+        initial_message_id: Optional[int] = None,
+        source_message_id: Optional[int] = None
     ) -> Optional[Message]:
         """Handle streaming chat response with real-time message editing.
         
@@ -231,47 +674,39 @@ class TelegramService:
             chat_id: Telegram chat ID
             user_message: User's message text
             initial_message_id: Optional initial message ID to edit
+            source_message_id: ID of the user's message, used to drop redelivered updates
             
         Returns:
             Final message or None if failed
         """
+        if source_message_id is not None and self._is_duplicate(chat_id, source_message_id):
+            return None
+        
         try:
-            # Send initial processing message if no message ID provided
             if initial_message_id is None:
-                initial_msg = await self.send_message(
-                    chat_id=chat_id,
-                    text="🤖 *Processing your message...*\n\n⏳ Thinking..."
-                )
+                # Send the processing message while FastAPI starts the session
+                async with asyncio.TaskGroup() as tg:
+                    send_task = tg.create_task(self.send_message(
+                        chat_id=chat_id,
+                        text="🤖 *Processing your message...*\n\n⏳ Thinking..."
+                    ))
+                    start_task = tg.create_task(self._start_chat_session(user_message))
+                
+                initial_msg = send_task.result()
                 if not initial_msg:
                     return None
                 initial_message_id = initial_msg.message_id
+                session_id, error_text = start_task.result()
+            else:
+                session_id, error_text = await self._start_chat_session(user_message)
             
-            # Start chat session with FastAPI
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.fastapi_base_url}/chat/",
-                    json={"message": user_message}
-                ) as response:
-                    
-                    if response.status != 200:
-                        error_data = await response.json()
-                        await self.edit_message(
-                            chat_id=chat_id,
-                            message_id=initial_message_id,
-                            text=f"❌ *Error Processing Message*\n\n{error_data.get('detail', 'Unknown error')}"
-                        )
-                        return None
-                    
-                    chat_result = await response.json()
-                    session_id = chat_result.get('session_id')
-                    
-                    if not session_id:
-                        await self.edit_message(
-                            chat_id=chat_id,
-                            message_id=initial_message_id,
-                            text="❌ *Error: No session ID received*\n\nPlease try your message again."
-                        )
-                        return None
+            if error_text:
+                await self.edit_message(
+                    chat_id=chat_id,
+                    message_id=initial_message_id,
+                    text=error_text
+                )
+                return None
             
             # Connect to WebSocket for streaming
             return await self._handle_websocket_streaming(
@@ -290,6 +725,39 @@ class TelegramService:
                 )
             return None
     
+    async def _start_chat_session(self, user_message: str) -> Tuple[Optional[str], Optional[str]]:
+        """Start a chat session with FastAPI.
+        
+        Never raises, so it can run alongside the processing-message send.
+        
+        Args:
+            user_message: User's message text
+            
+        Returns:
+            Tuple of (session ID, error message text); exactly one is set
+        """
+        try:
+            async with self._http_session().post(
+                self._chat_url,
+                json={"message": user_message}
+            ) as response:
+                
+                if response.status != 200:
+                    error_data = await response.json()
+                    return None, f"❌ *Error Processing Message*\n\n{error_data.get('detail', 'Unknown error')}"
+                
+                chat_result = await response.json()
+        
+        except Exception as e:
+            logger.error(f"Error starting chat session: {str(e)}")
+            return None, "❌ *Error Processing Message*\n\nAn unexpected error occurred. Please try again."
+        
+        session_id = chat_result.get('session_id')
+        if not session_id:
+            return None, "❌ *Error: No session ID received*\n\nPlease try your message again."
+        
+        return session_id, None
+    
     async def _handle_websocket_streaming(
         self, 
         chat_id: int, 
@@ -306,88 +774,68 @@ class TelegramService:
         Returns:
             Final message or None if failed
         """
+        stream: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        self._ws_streams[session_id] = stream
+        if self._ws_idle is not None:
+            self._ws_idle.cancel()
+            self._ws_idle = None
+        
         try:
-            ws_url = f"ws://localhost:8000/ws/stream?session_id={session_id}"
+            ws = await self._stream_socket()
+            await ws.send_str(orjson.dumps({"type": "start", "session_id": session_id}).decode())
             
-            accumulated_response = ""
-            last_update_time = 0
-            update_interval = 0.5  # Update every 500ms
-            max_message_length = 4000  # Telegram message limit with some buffer
+            # The reader only appends tokens; a separate task edits the message,
+            # so slow Telegram calls never stall reading the WebSocket
+            tokens: List[str] = []
+            editor = asyncio.create_task(self._edit_pump(chat_id, message_id, tokens))
             
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(ws_url) as ws:
+            try:
+                while True:
+                    data = await stream.get()
+                    if data is None:
+                        raise ConnectionError("Streaming connection closed")
+                    
+                    msg_type = data.get('type')
                     
-                    async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            try:
-                                data = json.loads(msg.data)
-                                msg_type = data.get('type')
-                                
-                                if msg_type == 'token':
-                                    # Accumulate tokens
-                                    token = data.get('content', '')
-                                    accumulated_response += token
-                                    
-                                    # Update message every 500ms
-                                    current_time = asyncio.get_event_loop().time()
-                                    if current_time - last_update_time >= update_interval:
-                                        # Truncate if too long
-                                        display_text = accumulated_response
-                                        if len(display_text) > max_message_length:
-                                            display_text = display_text[:max_message_length - 50] + "..."
-                                        
-                                        success = await self.edit_message(
-                                            chat_id=chat_id,
-                                            message_id=message_id,
-                                            text=f"🤖 *AI Response:*\n\n{display_text}..."
-                                        )
-                                        
-                                        if success:
-                                            last_update_time = current_time
-                                
-                                elif msg_type == 'final_result':
-                                    # Final response
-                                    result = data.get('result', {})
-                                    final_content = result.get('content', accumulated_response)
-                                    
-                                    # Truncate if too long
-                                    if len(final_content) > max_message_length:
-                                        final_content = final_content[:max_message_length - 50] + "..."
-                                    
-                                    await self.edit_message(
-                                        chat_id=chat_id,
-                                        message_id=message_id,
-                                        text=f"🤖 *AI Response:*\n\n{final_content}"
-                                    )
-                                    break
-                                
-                                elif msg_type == 'error':
-                                    # Error occurred
-                                    error_msg = data.get('error', 'Unknown error')
-                                    await self.edit_message(
-                                        chat_id=chat_id,
-                                        message_id=message_id,
-                                        text=f"❌ *Error:*\n\n{error_msg}"
-                                    )
-                                    break
-                                
-                                elif msg_type == 'event':
-                                    # Handle events (optional visual feedback)
-                                    event_type = data.get('event_type')
-                                    if event_type == 'execution_started':
-                                        await self.edit_message(
-                                            chat_id=chat_id,
-                                            message_id=message_id,
-                                            text="🤖 *AI Response:*\n\n🔄 Processing your request..."
-                                        )
-                            
-                            except json.JSONDecodeError:
-                                logger.warning(f"Invalid JSON from WebSocket: {msg.data}")
-                                continue
+                    if msg_type == 'token':
+                        # Accumulate tokens
+                        tokens.append(data.get('content', ''))
+                    
+                    elif msg_type == 'final_result':
+                        # Final response supersedes any pending partial edit
+                        editor.cancel()
+                        result = data.get('result', {})
+                        final_content = result.get('content', "".join(tokens))
                         
-                        elif msg.type == aiohttp.WSMsgType.ERROR:
-                            logger.error(f"WebSocket error: {ws.exception()}")
-                            break
+                        await self.edit_message(
+                            chat_id=chat_id,
+                            message_id=message_id,
+                            text=AI_RESPONSE_PREFIX + _truncate_message(final_content)
+                        )
+                        break
+                    
+                    elif msg_type == 'error':
+                        # Error occurred
+                        editor.cancel()
+                        error_msg = data.get('error', 'Unknown error')
+                        await self.edit_message(
+                            chat_id=chat_id,
+                            message_id=message_id,
+                            text=ERROR_PREFIX + error_msg
+                        )
+                        break
+                    
+                    elif msg_type == 'event':
+                        # Handle events (optional visual feedback)
+                        event_type = data.get('event_type')
+                        if event_type == 'execution_started':
+                            await self.edit_message(
+                                chat_id=chat_id,
+                                message_id=message_id,
+                                text=AI_RESPONSE_PREFIX + "🔄 Processing your request..."
+                            )
+            finally:
+                editor.cancel()
             
             return None  # Message was edited in place
         
@@ -399,12 +847,53 @@ class TelegramService:
                 text="❌ *Error during response streaming*\n\nThe response was interrupted. Please try again."
             )
             return None
+        
+        finally:
+            self._ws_streams.pop(session_id, None)
+            self._schedule_idle_close()
+    
+    async def _edit_pump(self, chat_id: int, message_id: int, tokens: List[str]) -> None:
+        """Periodically show the streamed text so far until cancelled.
+        
+        Args:
+            chat_id: Telegram chat ID
+            message_id: Message ID to edit
+            tokens: Tokens received so far, appended to by the WebSocket reader
+        """
+        shown_length = 0
+        received = 0  # Tokens already counted into length
+        length = 0
+        
+        while True:
+            await asyncio.sleep(STREAM_EDIT_INTERVAL)
+            
+            # Measure only the tokens that arrived since the last tick
+            count = len(tokens)
+            for i in range(received, count):
+                length += len(tokens[i])
+            received = count
+            
+            if length - shown_length < STREAM_EDIT_MIN_CHARS:
+                continue
+            
+            # Once truncated, the shown text can no longer change
+            if shown_length > MAX_MESSAGE_LENGTH:
+                return
+            
+            text = _truncate_message("".join(tokens[:received]), length)
+            if await self.edit_message(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=AI_RESPONSE_PREFIX + text + STREAMING_SUFFIX
+            ):
+                shown_length = length
     
     async def handle_document_upload(
         self, 
         chat_id: int, 
         file_id: str, 
-        filename: str
+        filename: str,
+        source_message_id: Optional[int] = None
     ) -> Optional[Message]:
         """Handle document upload and processing.
         
@@ -412,10 +901,14 @@ class TelegramService:
             chat_id: Telegram chat ID
             file_id: Telegram file ID
             filename: Original filename
+            source_message_id: ID of the user's message, used to drop redelivered updates
             
         Returns:
             Response message or None if failed
         """
+        if source_message_id is not None and self._is_duplicate(chat_id, source_message_id):
+            return None
+        
         try:
             # Validate file type
             if not filename.lower().endswith('.pdf'):
@@ -424,49 +917,62 @@ class TelegramService:
                     text="❌ *Only PDF files are supported*\n\nPlease upload a PDF document to add it to the knowledge base."
                 )
             
-            # Send processing message
-            processing_msg = await self.send_message(
-                chat_id=chat_id,
-                text=f"📄 *Processing PDF: {filename}*\n\n⏳ Downloading and analyzing document...\nThis may take a few moments."
-            )
+            # A file ingested moments ago is already in the knowledge base
+            cached = self._cached_ingest(file_id)
+            if cached is not None:
+                logger.info(f"Reusing ingest result for file {file_id} in chat {chat_id}")
+                return await self.send_message(
+                    chat_id=chat_id,
+                    text=_ingest_summary(cached, filename)
+                )
             
+            # Send processing message while resolving the file path
+            async with asyncio.TaskGroup() as tg:
+                send_task = tg.create_task(self.send_message(
+                    chat_id=chat_id,
+                    text=f"📄 *Processing PDF: {filename}*\n\n⏳ Downloading and analyzing document...\nThis may take a few moments."
+                ))
+                file_task = tg.create_task(self.bot.get_file(file_id))
+            
+            processing_msg = send_task.result()
             if not processing_msg:
                 return None
             
-            # Download file from Telegram
-            file_info = await self.bot.get_file(file_id)
-            file_content = await self.bot.download_file(file_info.file_path)
-            
-            # Prepare multipart form data
-            form_data = aiohttp.FormData()
-            form_data.add_field(
-                'file',
-                file_content,
-                filename=filename,
-                content_type='application/pdf'
-            )
+            # Stream the file from Telegram straight into the ingestion request,
+            # so the PDF is never held in memory in full
+            file_info = file_task.result()
+            file_url = self.bot.session.api.file_url(self.bot.token, file_info.file_path)
             
-            # Send to FastAPI ingestion endpoint
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.fastapi_base_url}/ingest/pdf",
+            async with self._http_session().get(file_url) as download:
+                # The file URL embeds the bot token, so report only the status;
+                # the error from raise_for_status() would log the full URL
+                if download.status != 200:
+                    raise RuntimeError(f"Telegram file download failed with HTTP {download.status}")
+                
+                # Prepare multipart form data
+                form_data = aiohttp.FormData()
+                form_data.add_field(
+                    'file',
+                    download.content,
+                    filename=filename,
+                    content_type='application/pdf'
+                )
+                
+                # Send to FastAPI ingestion endpoint
+                async with self._http_session().post(
+                    self._ingest_url,
                     data=form_data
                 ) as response:
                     
                     if response.status == 200:
                         result = await response.json()
+                        self._remember_ingest(file_id, result)
                         
                         # Update message with success
                         await self.edit_message(
                             chat_id=chat_id,
                             message_id=processing_msg.message_id,
-                            text=(
-                                f"✅ *PDF Processed Successfully!*\n\n"
-                                f"📄 **File:** {result.get('filename', filename)}\n"
-                                f"📊 **Pages:** {result.get('document_count', 'unknown')}\n"
-                                f"🔤 **Text Chunks:** {result.get('chunk_count', 'unknown')}\n\n"
-                                f"💡 You can now ask questions about this document!"
-                            )
+                            text=_ingest_summary(result, filename)
                         )
                         return processing_msg
                     else:
@@ -501,31 +1007,37 @@ class TelegramService:
                     text="❌ *Error Processing PDF*\n\nAn unexpected error occurred. Please try again."
                 )
     
+    @_telegram_call("getting bot info")
     async def get_bot_info(self) -> Optional[Dict[str, Any]]:
         """Get bot information.
         
         Returns:
             Bot information or None if failed
         """
-        try:
-            me = await self.bot.get_me()
-            return {
-                "id": me.id,
-                "username": me.username,
-                "first_name": me.first_name,
-                "is_bot": me.is_bot,
-                "can_join_groups": me.can_join_groups,
-                "can_read_all_group_messages": me.can_read_all_group_messages,
-                "supports_inline_queries": me.supports_inline_queries
-            }
-        
-        except Exception as e:
-            logger.error(f"Error getting bot info: {str(e)}")
-            return None
+        me = await self.bot.get_me()
+        return {
+            "id": me.id,
+            "username": me.username,
+            "first_name": me.first_name,
+            "is_bot": me.is_bot,
+            "can_join_groups": me.can_join_groups,
+            "can_read_all_group_messages": me.can_read_all_group_messages,
+            "supports_inline_queries": me.supports_inline_queries
+        }
     
     async def close(self):
-        """Close the bot session."""
+        """Close the streaming WebSocket and the HTTP and bot sessions."""
         try:
+            if self._prewarm_task is not None:
+                self._prewarm_task.cancel()
+            if self._ws_idle is not None:
+                self._ws_idle.cancel()
+            if self._ws is not None:
+                await self._ws.close()
+            if self._ws_reader is not None:
+                await self._ws_reader
+            if self._http is not None:
+                await self._http.close()
             await self.bot.session.close()
             logger.info("Telegram service closed")
         except Exception as e:
@@ -556,5 +1068,14 @@ def initialize_telegram_service(settings: Settings) -> TelegramService:
     """
     global _telegram_service
     _telegram_service = TelegramService(settings)
+    
+    # Warm the backend connection in the background when started from async code
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        _telegram_service._prewarm_task = loop.create_task(_telegram_service.prewarm())
+    
     return _telegram_service
 
@@ -1,15 +1,59 @@
 """Structured logging configuration for the Task Management RAG application."""
 
+import functools
 import logging
 import logging.handlers
+import os
+import queue
+import re
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from ..config import Settings
 
+# Userspace buffer for log files; flushed when the log queue drains
+LOG_FILE_BUFFER_SIZE = 64 * 1024
 
-class ColoredFormatter(logging.Formatter):
+# Timestamp suffix of backups written by PruningRotatingFileHandler
+_BACKUP_SUFFIX = re.compile(r"\d{8}-\d{6}-\d{6}")
+
+# Background thread writing queued records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders each second's timestamp only once.
+    
+    Records logged within the same second share the formatted ``asctime``
+    instead of each calling ``time.localtime`` and ``time.strftime``.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        """Initialize the formatter with an empty timestamp cache."""
+        super().__init__(*args, **kwargs)
+        # (epoch second, formatted timestamp); replaced as a whole so that
+        # concurrent handlers never see a mismatched pair
+        self._time_cache: Tuple[int, str] = (-1, "")
+    
+    def formatTime(self, record, datefmt=None):
+        """Format the record's creation time, reusing the last second's result."""
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, cached_text = self._time_cache
+        if second == cached_second:
+            return cached_text
+        
+        text = time.strftime(datefmt, self.converter(second))
+        self._time_cache = (second, text)
+        return text
+
+
+class ColoredFormatter(CachedTimeFormatter):
     """Custom formatter with color support for console output."""
     
     # ANSI color codes
@@ -22,19 +66,129 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'        # Reset
     }
     
+    def __init__(self, *args, **kwargs):
+        """Initialize the formatter with precomputed colored level names."""
+        super().__init__(*args, **kwargs)
+        self._colored_levels = {
+            level: f"{color}{level}{self.COLORS['RESET']}"
+            for level, color in self.COLORS.items()
+            if level != 'RESET'
+        }
+    
     def format(self, record):
         """Format log record with colors for console output."""
-        # Add color to levelname
-        if record.levelname in self.COLORS:
-            record.levelname = (
-                f"{self.COLORS[record.levelname]}{record.levelname}"
-                f"{self.COLORS['RESET']}"
-            )
+        # Color the levelname only while formatting; the record is shared
+        # with the file handlers, which must not see escape codes
+        levelname = record.levelname
+        record.levelname = self._colored_levels.get(levelname, levelname)
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+
+class PruningRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-rotating file handler that renames only the active file.
+    
+    Backups get a timestamp suffix instead of a shifting index, so a
+    rollover is one rename plus one directory scan that deletes backups
+    beyond ``backupCount``, rather than a rename for every backup.
+    
+    Records collect in a large write buffer instead of being flushed one by
+    one; ``flush_buffer`` writes them out. The file size is tracked in
+    characters rather than read back with ``seek``/``tell``, which would
+    flush the buffer on every record, so files may exceed ``maxBytes``
+    slightly when records contain non-ASCII text.
+    """
+    
+    def _open(self):
+        """Open the log file in append mode with a large write buffer."""
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=LOG_FILE_BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors
+        )
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+    
+    def emit(self, record):
+        """Write a record, rolling over first if it would exceed ``maxBytes``."""
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += len(msg)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        """Keep records buffered; closing the handler still writes them."""
+    
+    def flush_buffer(self):
+        """Write buffered records to the file."""
+        super().flush()
+    
+    def doRollover(self):
+        """Move the active file aside and prune the oldest backups."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
         
-        # Format the message
-        formatted = super().format(record)
+        if self.backupCount > 0:
+            # Microsecond timestamps sort in rollover order
+            suffix = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            target = self.rotation_filename(f"{self.baseFilename}.{suffix}")
+            if os.path.exists(self.baseFilename):
+                self.rotate(self.baseFilename, target)
+            self._prune_backups()
+        
+        if not self.delay:
+            self.stream = self._open()
+    
+    def _prune_backups(self):
+        """Delete all but the newest ``backupCount`` backups.
+        
+        Only timestamped backups are considered, so numbered backups left by
+        ``RotatingFileHandler`` neither count towards the limit nor get deleted.
+        """
+        directory, basename = os.path.split(self.baseFilename)
+        prefix = basename + "."
         
-        return formatted
+        with os.scandir(directory) as entries:
+            backups = sorted(
+                entry.path for entry in entries
+                if entry.name.startswith(prefix)
+                and _BACKUP_SUFFIX.fullmatch(entry.name, len(prefix))
+                and entry.is_file()
+            )
+        
+        for path in backups[:-self.backupCount]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class _DrainFlushingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that flushes buffered handlers once the queue is empty."""
+    
+    def handle(self, record):
+        """Dispatch a record, flushing file buffers when no more are waiting."""
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                flush_buffer = getattr(handler, "flush_buffer", None)
+                if flush_buffer is not None:
+                    flush_buffer()
 
 
 def setup_logging(settings: Settings) -> None:
@@ -47,11 +201,14 @@ def setup_logging(settings: Settings) -> None:
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
+    global _queue_listener
+    
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, settings.log_level.upper()))
     
     # Clear any existing handlers
+    stop_logging()
     root_logger.handlers.clear()
     
     # Console handler with colors
@@ -63,47 +220,72 @@ def setup_logging(settings: Settings) -> None:
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler for all logs
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = PruningRotatingFileHandler(
         filename=log_dir / "app.log",
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     file_handler.setLevel(logging.DEBUG)  # Always log everything to file
     
-    file_formatter = logging.Formatter(
+    file_formatter = CachedTimeFormatter(
         fmt='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
     
     # Error file handler for errors and above
-    error_handler = logging.handlers.RotatingFileHandler(
+    error_handler = PruningRotatingFileHandler(
         filename=log_dir / "error.log",
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     error_handler.setLevel(logging.ERROR)
     
-    error_formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s\n%(exc_info)s',
+    # Tracebacks of records logged with exc_info are appended by the formatter
+    error_formatter = CachedTimeFormatter(
+        fmt='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     error_handler.setFormatter(error_formatter)
-    root_logger.addHandler(error_handler)
+    
+    # Loggers only enqueue records; a listener thread formats and writes them,
+    # so console and file I/O never runs on the event loop
+    log_queue: queue.Queue = queue.Queue(-1)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = _DrainFlushingQueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        error_handler,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
     
     # Configure specific loggers
     configure_module_loggers(settings)
     
     # Log startup message
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured with level: {settings.log_level.upper()}")
-    logger.info(f"Log files will be written to: {log_dir.absolute()}")
+    logger.info("Logging configured with level: %s", settings.log_level.upper())
+    logger.info("Log files will be written to: %s", log_dir.absolute())
+
+
+def stop_logging() -> None:
+    """Write out queued log records and stop the listener thread."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.flush()
+            if isinstance(handler, PruningRotatingFileHandler):
+                handler.flush_buffer()
+        _queue_listener = None
 
 
 def configure_module_loggers(settings: Settings) -> None:
@@ -179,22 +361,25 @@ def log_function_call(func_name: str, args: Optional[dict] = None, kwargs: Optio
         kwargs: Function keyword arguments
     """
     def decorator(func):
+        logger = logging.getLogger(func.__module__)
+        
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            logger = logging.getLogger(func.__module__)
-            
-            # Log function entry
-            arg_str = ", ".join([str(arg) for arg in args])
-            kwarg_str = ", ".join([f"{k}={v}" for k, v in kwargs.items()])
-            all_args = ", ".join(filter(None, [arg_str, kwarg_str]))
-            
-            logger.debug(f"Calling {func_name}({all_args})")
+            # Nothing is stringified unless DEBUG records are kept
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                arg_str = ", ".join([str(arg) for arg in args])
+                kwarg_str = ", ".join([f"{k}={v}" for k, v in kwargs.items()])
+                all_args = ", ".join(filter(None, [arg_str, kwarg_str]))
+                logger.debug("Calling %s(%s)", func_name, all_args)
             
             try:
                 result = func(*args, **kwargs)
-                logger.debug(f"{func_name} completed successfully")
+                if debug:
+                    logger.debug("%s completed successfully", func_name)
                 return result
             except Exception as e:
-                logger.error(f"{func_name} failed with error: {str(e)}")
+                logger.exception("%s failed with error: %s", func_name, e)
                 raise
         
         return wrapper
@@ -208,22 +393,25 @@ def log_async_function_call(func_name: str):
         func_name: Function name to log
     """
     def decorator(func):
+        logger = logging.getLogger(func.__module__)
+        
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            logger = logging.getLogger(func.__module__)
-            
-            # Log function entry
-            arg_str = ", ".join([str(arg) for arg in args])
-            kwarg_str = ", ".join([f"{k}={v}" for k, v in kwargs.items()])
-            all_args = ", ".join(filter(None, [arg_str, kwarg_str]))
-            
-            logger.debug(f"Calling async {func_name}({all_args})")
+            # Nothing is stringified unless DEBUG records are kept
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                arg_str = ", ".join([str(arg) for arg in args])
+                kwarg_str = ", ".join([f"{k}={v}" for k, v in kwargs.items()])
+                all_args = ", ".join(filter(None, [arg_str, kwarg_str]))
+                logger.debug("Calling async %s(%s)", func_name, all_args)
             
             try:
                 result = await func(*args, **kwargs)
-                logger.debug(f"Async {func_name} completed successfully")
+                if debug:
+                    logger.debug("Async %s completed successfully", func_name)
                 return result
             except Exception as e:
-                logger.error(f"Async {func_name} failed with error: {str(e)}")
+                logger.exception("Async %s failed with error: %s", func_name, e)
                 raise
         
         return wrapper
@@ -271,8 +459,10 @@ def configure_request_logging():
         # Log request
         start_time = time.time()
         logger.info(
-            f"Request started: {request.method} {request.url} "
-            f"from {request.client.host if request.client else 'unknown'}"
+            "Request started: %s %s from %s",
+            request.method,
+            request.url,
+            request.client.host if request.client else 'unknown'
         )
         
         # Process request
@@ -281,8 +471,11 @@ def configure_request_logging():
         # Log response
         process_time = time.time() - start_time
         logger.info(
-            f"Request completed: {request.method} {request.url} "
-            f"-> {response.status_code} in {process_time:.3f}s"
+            "Request completed: %s %s -> %s in %.3fs",
+            request.method,
+            request.url,
+            response.status_code,
+            process_time
         )
         
         return response
@@ -301,17 +494,17 @@ def log_startup_info(settings: Settings):
     logger.info("=" * 60)
     logger.info("Task Management RAG Application Starting")
     logger.info("=" * 60)
-    logger.info(f"Environment: {settings.environment}")
-    logger.info(f"Log Level: {settings.log_level.upper()}")
-    logger.info(f"OpenAI Model: {settings.model_name}")
-    logger.info(f"Embeddings Model: {settings.embeddings_model}")
-    logger.info(f"Uploads Directory: {settings.uploads_dir}")
-    logger.info(f"Chroma Directory: {settings.chroma_dir}")
+    logger.info("Environment: %s", settings.environment)
+    logger.info("Log Level: %s", settings.log_level.upper())
+    logger.info("OpenAI Model: %s", settings.model_name)
+    logger.info("Embeddings Model: %s", settings.embeddings_model)
+    logger.info("Uploads Directory: %s", settings.uploads_dir)
+    logger.info("Chroma Directory: %s", settings.chroma_dir)
     
     if settings.telegram_bot_token:
         logger.info("Telegram Bot: Configured")
         if settings.telegram_webhook_url:
-            logger.info(f"Telegram Webhook: {settings.telegram_webhook_url}")
+            logger.info("Telegram Webhook: %s", settings.telegram_webhook_url)
         else:
             logger.info("Telegram Mode: Polling")
     else:
@@ -349,8 +542,10 @@ class PerformanceLogger:
             duration: Duration in seconds
             **kwargs: Additional context
         """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         context = " ".join([f"{k}={v}" for k, v in kwargs.items()])
-        self.logger.info(f"Performance: {operation} took {duration:.3f}s {context}")
+        self.logger.info("Performance: %s took %.3fs %s", operation, duration, context)
     
     def log_memory_usage(self, operation: str, memory_mb: float):
         """Log memory usage.
@@ -359,7 +554,7 @@ class PerformanceLogger:
             operation: Operation name
             memory_mb: Memory usage in MB
         """
-        self.logger.info(f"Memory: {operation} used {memory_mb:.2f}MB")
+        self.logger.info("Memory: %s used %.2fMB", operation, memory_mb)
 
 
 # Context manager for timing operations
@@ -381,7 +576,7 @@ class TimedOperation:
         """Start timing."""
         import time
         self.start_time = time.time()
-        self.logger.debug(f"Starting operation: {self.operation_name}")
+        self.logger.debug("Starting operation: %s", self.operation_name)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -390,9 +585,9 @@ class TimedOperation:
         duration = time.time() - self.start_time
         
         if exc_type is None:
-            self.logger.info(f"Operation completed: {self.operation_name} in {duration:.3f}s")
+            self.logger.info("Operation completed: %s in %.3fs", self.operation_name, duration)
         else:
-            self.logger.error(f"Operation failed: {self.operation_name} after {duration:.3f}s")
+            self.logger.error("Operation failed: %s after %.3fs", self.operation_name, duration)
 
 
 # Structured logging for specific events
@@ -405,6 +600,8 @@ def log_user_action(user_id: str, action: str, details: Optional[dict] = None):
         details: Additional action details
     """
     logger = logging.getLogger("app.analytics.user_actions")
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     log_data = {
         "user_id": user_id,
@@ -417,7 +614,7 @@ def log_user_action(user_id: str, action: str, details: Optional[dict] = None):
     if details:
         log_data.update(details)
     
-    logger.info(f"User action: {log_data}")
+    logger.info("User action: %s", log_data)
 
 
 def log_system_event(event_type: str, details: Optional[dict] = None):
@@ -428,6 +625,8 @@ def log_system_event(event_type: str, details: Optional[dict] = None):
         details: Additional event details
     """
     logger = logging.getLogger("app.system.events")
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
     log_data = {
         "event_type": event_type,
@@ -439,12 +638,15 @@ def log_system_event(event_type: str, details: Optional[dict] = None):
     if details:
         log_data.update(details)
     
-    logger.info(f"System event: {log_data}")
+    logger.info("System event: %s", log_data)
 
 
 # Export commonly used functions
 __all__ = [
     'setup_logging',
+    'stop_logging',
+    'CachedTimeFormatter',
+    'PruningRotatingFileHandler',
     'get_logger',
     'log_function_call',
     'log_async_function_call',
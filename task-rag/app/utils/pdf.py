@@ -1,78 +1,233 @@
 """PDF processing utilities with safe file operations and validation."""
 
+import io
+import mmap
 import os
 import shutil
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple, Union
+from uuid import uuid4
 import logging
 
 from pypdf import PdfReader
 
 logger = logging.getLogger(__name__)
 
+# Chunk size used when copying an upload stream to disk
+UPLOAD_COPY_CHUNK_SIZE = 256 * 1024
+
+# Every PDF file starts with this header
+PDF_MAGIC = b"%PDF-"
+
+# Replaces characters that are unsafe in filenames with underscores
+_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+# Attempts at claiming a free upload filename before giving up
+UNIQUE_NAME_ATTEMPTS = 8
+
+# Largest accepted PDF in bytes
+MAX_PDF_SIZE = 50 * 1024 * 1024
+
 
 class PDFValidationError(Exception):
     """Exception raised when PDF validation fails."""
     pass
 
 
-def validate_pdf_file(file_path: Path) -> Tuple[bool, Optional[str]]:
-    """Validate that a file is a valid PDF.
+def _read_pdf_stream(stream: BinaryIO) -> Tuple[Optional[PdfReader], Optional[str]]:
+    """Open a PDF reader over a seekable binary stream after sanity checks.
+    
+    Size and header are checked before the PDF is parsed, and the stream is
+    rewound afterwards so it can be saved without being read again.
     
     Args:
-        file_path: Path to the PDF file to validate
+        stream: Seekable binary stream positioned anywhere
         
     Returns:
-        Tuple of (is_valid, error_message)
+        Tuple of (reader, error_message); the reader is None if the PDF is invalid
     """
     try:
-        if not file_path.exists():
-            return False, "File does not exist"
-        
-        if not file_path.is_file():
-            return False, "Path is not a file"
-        
-        # Check file extension
-        if file_path.suffix.lower() != '.pdf':
-            return False, "File does not have .pdf extension"
-        
-        # Check file size (max 50MB)
-        file_size = file_path.stat().st_size
-        max_size = 50 * 1024 * 1024  # 50MB
-        if file_size > max_size:
-            return False, f"File size ({file_size / 1024 / 1024:.1f}MB) exceeds maximum allowed size (50MB)"
+        # mmap.seek() returns None before Python 3.13, so ask tell() for the size
+        stream.seek(0, os.SEEK_END)
+        file_size = stream.tell()
+        if file_size > MAX_PDF_SIZE:
+            return None, f"File size ({file_size / 1024 / 1024:.1f}MB) exceeds maximum allowed size (50MB)"
         
         if file_size == 0:
-            return False, "File is empty"
+            return None, "File is empty"
+        
+        if not has_pdf_signature(stream):
+            return None, "File does not start with a PDF header"
         
         # Try to read the PDF
         try:
-            reader = PdfReader(str(file_path))
+            reader = PdfReader(stream)
             num_pages = len(reader.pages)
             
             if num_pages == 0:
-                return False, "PDF has no pages"
+                return None, "PDF has no pages"
             
-            # Try to extract text from first page to ensure it's readable
-            first_page = reader.pages[0]
-            text = first_page.extract_text()
+            # Resolve the first page object to ensure the page tree is readable;
+            # its content stream is left undecoded
+            reader.pages[0].mediabox
             
-            logger.info(f"PDF validation successful: {num_pages} pages, {len(text)} characters on first page")
-            return True, None
+            logger.info(f"PDF validation successful: {num_pages} pages")
+            return reader, None
             
         except Exception as e:
-            return False, f"Failed to read PDF: {str(e)}"
+            return None, f"Failed to read PDF: {str(e)}"
+        
+        finally:
+            stream.seek(0)
+    
+    except Exception as e:
+        logger.error(f"Error validating PDF stream: {str(e)}")
+        return None, f"Validation error: {str(e)}"
+
+
+def validate_pdf_stream(stream: BinaryIO) -> Tuple[bool, Optional[str]]:
+    """Validate that a seekable binary stream holds a valid PDF.
+    
+    Args:
+        stream: Seekable binary stream positioned anywhere; rewound afterwards
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    reader, error_msg = _read_pdf_stream(stream)
+    return reader is not None, error_msg
+
+
+def validate_pdf_bytes(data: bytes) -> Tuple[bool, Optional[str]]:
+    """Validate that in-memory content is a valid PDF.
+    
+    Args:
+        data: File content
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    return validate_pdf_stream(io.BytesIO(data))
+
+
+def _check_pdf_path(file_path: Path) -> Optional[str]:
+    """Check that a path names a non-empty file with a .pdf extension.
+    
+    Args:
+        file_path: Path to check
+        
+    Returns:
+        Error message, or None if the path can be opened as a PDF
+    """
+    if not file_path.exists():
+        return "File does not exist"
+    
+    if not file_path.is_file():
+        return "Path is not a file"
+    
+    # Check file extension
+    if file_path.suffix.lower() != '.pdf':
+        return "File does not have .pdf extension"
+    
+    # mmap cannot map an empty file
+    if file_path.stat().st_size == 0:
+        return "File is empty"
+    
+    return None
+
+
+def _map_file(file_obj: BinaryIO) -> mmap.mmap:
+    """Map an open file read-only, prefetching its pages where supported.
+    
+    PDF readers parse straight from the page cache instead of copying the
+    file into Python buffers.
+    
+    Args:
+        file_obj: File opened for binary reading
+        
+    Returns:
+        Read-only memory map of the whole file
+    """
+    if hasattr(mmap, "MAP_POPULATE"):
+        return mmap.mmap(
+            file_obj.fileno(),
+            0,
+            flags=mmap.MAP_SHARED | mmap.MAP_POPULATE,
+            prot=mmap.PROT_READ
+        )
+    return mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def validate_pdf_file(file_path: Path) -> Tuple[bool, Optional[str]]:
+    """Validate that a file is a valid PDF.
+    
+    Args:
+        file_path: Path to the PDF file to validate
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    try:
+        error_msg = _check_pdf_path(file_path)
+        if error_msg:
+            return False, error_msg
+        
+        with open(file_path, 'rb') as f, _map_file(f) as mapped:
+            return validate_pdf_stream(mapped)
     
     except Exception as e:
         logger.error(f"Error validating PDF {file_path}: {str(e)}")
         return False, f"Validation error: {str(e)}"
 
 
-def safe_save_uploaded_file(file_content: bytes, filename: str, upload_dir: Path) -> Path:
+def inspect_pdf_file(file_path: Path) -> Tuple[bool, Optional[str], dict]:
+    """Validate a PDF file and extract its metadata from a single parse.
+    
+    Args:
+        file_path: Path to the PDF file
+        
+    Returns:
+        Tuple of (is_valid, error_message, metadata); metadata is empty if invalid
+    """
+    try:
+        error_msg = _check_pdf_path(file_path)
+        if error_msg:
+            return False, error_msg, {}
+        
+        with open(file_path, 'rb') as f, _map_file(f) as mapped:
+            reader, error_msg = _read_pdf_stream(mapped)
+            if reader is None:
+                return False, error_msg, {}
+            return True, None, _metadata_from_reader(reader, file_path, len(mapped))
+    
+    except Exception as e:
+        logger.error(f"Error inspecting PDF {file_path}: {str(e)}")
+        return False, f"Validation error: {str(e)}", {}
+
+
+def has_pdf_signature(file_obj: BinaryIO) -> bool:
+    """Check that a binary stream starts with the PDF header.
+    
+    Only the first few bytes are read and the stream is rewound afterwards.
+    
+    Args:
+        file_obj: Binary file object positioned anywhere
+        
+    Returns:
+        True if the stream starts with the PDF magic bytes
+    """
+    file_obj.seek(0)
+    header = file_obj.read(len(PDF_MAGIC))
+    file_obj.seek(0)
+    return header == PDF_MAGIC
+
+
+def safe_save_uploaded_file(file_content: Union[bytes, BinaryIO], filename: str, upload_dir: Path) -> Path:
     """Safely save an uploaded file to the uploads directory.
     
     Args:
-        file_content: The file content as bytes
+        file_content: The file content as bytes, or a binary file object that
+            is copied to disk in chunks without loading it into memory
         filename: Original filename
         upload_dir: Directory to save the file
         
@@ -90,34 +245,33 @@ def safe_save_uploaded_file(file_content: bytes, filename: str, upload_dir: Path
         # Sanitize filename
         safe_filename = sanitize_filename(filename)
         
-        # Create unique filename if file already exists
+        # Validate before writing, so the content is read once and invalid
+        # uploads never reach the disk
+        if isinstance(file_content, (bytes, bytearray)):
+            file_content = io.BytesIO(file_content)
+        is_valid, error_msg = validate_pdf_stream(file_content)
+        if not is_valid:
+            raise PDFValidationError(f"Invalid PDF file: {error_msg}")
+        
+        # Claim the filename atomically; on a clash retry with a random suffix,
+        # so concurrent uploads of the same name never overwrite each other
+        stem, ext = os.path.splitext(safe_filename)
         file_path = upload_dir / safe_filename
-        counter = 1
-        while file_path.exists():
-            name_parts = safe_filename.rsplit('.', 1)
-            if len(name_parts) == 2:
-                name, ext = name_parts
-                file_path = upload_dir / f"{name}_{counter}.{ext}"
-            else:
-                file_path = upload_dir / f"{safe_filename}_{counter}"
-            counter += 1
+        for _ in range(UNIQUE_NAME_ATTEMPTS):
+            try:
+                fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                break
+            except FileExistsError:
+                file_path = upload_dir / f"{stem}_{uuid4().hex[:8]}{ext}"
+        else:
+            raise FileExistsError(f"No free filename found for {safe_filename}")
         
         # Write file content
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        with os.fdopen(fd, 'wb') as f:
+            file_content.seek(0)
+            shutil.copyfileobj(file_content, f, UPLOAD_COPY_CHUNK_SIZE)
         
         logger.info(f"File saved to {file_path}")
-        
-        # Validate the saved PDF
-        is_valid, error_msg = validate_pdf_file(file_path)
-        if not is_valid:
-            # Clean up invalid file
-            try:
-                file_path.unlink()
-            except Exception:
-                pass
-            raise PDFValidationError(f"Invalid PDF file: {error_msg}")
-        
         return file_path
     
     except Exception as e:
@@ -135,9 +289,7 @@ def sanitize_filename(filename: str) -> str:
         Sanitized filename
     """
     # Remove or replace dangerous characters
-    dangerous_chars = '<>:"/\\|?*'
-    for char in dangerous_chars:
-        filename = filename.replace(char, '_')
+    filename = filename.translate(_SANITIZE_TABLE)
     
     # Remove leading/trailing whitespace and dots
     filename = filename.strip(' .')
@@ -158,6 +310,39 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
+def _metadata_from_reader(reader: PdfReader, file_path: Path, file_size: int) -> dict:
+    """Collect metadata from an open PDF reader.
+    
+    Args:
+        reader: Reader over the PDF
+        file_path: Path to the PDF file
+        file_size: File size in bytes
+        
+    Returns:
+        Dictionary containing PDF metadata
+    """
+    metadata = {
+        'num_pages': len(reader.pages),
+        'file_size': file_size,
+        'filename': file_path.name,
+    }
+    
+    # Add PDF metadata if available
+    if reader.metadata:
+        pdf_meta = reader.metadata
+        metadata.update({
+            'title': pdf_meta.get('/Title', ''),
+            'author': pdf_meta.get('/Author', ''),
+            'subject': pdf_meta.get('/Subject', ''),
+            'creator': pdf_meta.get('/Creator', ''),
+            'producer': pdf_meta.get('/Producer', ''),
+            'creation_date': str(pdf_meta.get('/CreationDate', '')),
+            'modification_date': str(pdf_meta.get('/ModDate', '')),
+        })
+    
+    return metadata
+
+
 def get_pdf_metadata(file_path: Path) -> dict:
     """Extract metadata from a PDF file.
     
@@ -168,27 +353,8 @@ def get_pdf_metadata(file_path: Path) -> dict:
         Dictionary containing PDF metadata
     """
     try:
-        reader = PdfReader(str(file_path))
-        metadata = {
-            'num_pages': len(reader.pages),
-            'file_size': file_path.stat().st_size,
-            'filename': file_path.name,
-        }
-        
-        # Add PDF metadata if available
-        if reader.metadata:
-            pdf_meta = reader.metadata
-            metadata.update({
-                'title': pdf_meta.get('/Title', ''),
-                'author': pdf_meta.get('/Author', ''),
-                'subject': pdf_meta.get('/Subject', ''),
-                'creator': pdf_meta.get('/Creator', ''),
-                'producer': pdf_meta.get('/Producer', ''),
-                'creation_date': str(pdf_meta.get('/CreationDate', '')),
-                'modification_date': str(pdf_meta.get('/ModDate', '')),
-            })
-        
-        return metadata
+        with open(file_path, 'rb') as f, _map_file(f) as mapped:
+            return _metadata_from_reader(PdfReader(mapped), file_path, len(mapped))
     
     except Exception as e:
         logger.error(f"Error extracting PDF metadata from {file_path}: {str(e)}")
@@ -3,16 +3,20 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from uuid import uuid4
 
 from fastapi import WebSocket, WebSocketDisconnect, Query
 from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
 
 from .graph.graph import CompiledGraph
 
 logger = logging.getLogger(__name__)
 
+# Tokens that arrive within this window (seconds) are sent as one frame
+TOKEN_FLUSH_INTERVAL = 0.005
+
 
 class WebSocketManager:
     """Manager for WebSocket connections and streaming sessions."""
@@ -21,6 +25,8 @@ class WebSocketManager:
         """Initialize the WebSocket manager."""
         self.active_connections: Dict[str, WebSocket] = {}
         self.sessions: Dict[str, Dict[str, Any]] = {}
+        self._token_buffers: Dict[str, List[str]] = {}
+        self._token_flushers: Dict[str, asyncio.Task] = {}
         logger.info("WebSocket manager initialized")
     
     async def connect(self, websocket: WebSocket, session_id: str):
@@ -40,15 +46,14 @@ class WebSocketManager:
         Args:
             session_id: Session ID to disconnect
         """
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
+        self.active_connections.pop(session_id, None)
+        self._drop_tokens(session_id)
         
-        if session_id in self.sessions:
+        session_data = self.sessions.pop(session_id, None)
+        if session_data is not None:
             # Cancel any running tasks
-            session_data = self.sessions[session_id]
             if 'task' in session_data and not session_data['task'].done():
                 session_data['task'].cancel()
-            del self.sessions[session_id]
         
         logger.info(f"WebSocket disconnected for session: {session_id}")
     
@@ -80,6 +85,56 @@ class WebSocketManager:
             "session_id": session_id
         })
     
+    def queue_token(self, session_id: str, token: str) -> None:
+        """Buffer a streamed token so bursts go out as a single frame.
+        
+        Must be called from the event loop thread.
+        
+        Args:
+            session_id: Session ID
+            token: Token to send
+        """
+        self._token_buffers.setdefault(session_id, []).append(token)
+        if session_id not in self._token_flushers:
+            self._token_flushers[session_id] = asyncio.create_task(self._flush_tokens(session_id))
+    
+    async def _flush_tokens(self, session_id: str):
+        """Send buffered tokens until no more arrive within the flush window.
+        
+        Args:
+            session_id: Session ID
+        """
+        try:
+            while True:
+                await asyncio.sleep(TOKEN_FLUSH_INTERVAL)
+                tokens = self._token_buffers.pop(session_id, None)
+                if not tokens:
+                    return
+                await self.broadcast_token(session_id, "".join(tokens))
+        finally:
+            self._token_flushers.pop(session_id, None)
+    
+    async def wait_for_tokens(self, session_id: str):
+        """Wait until all buffered tokens for a session have been sent.
+        
+        Args:
+            session_id: Session ID
+        """
+        flusher = self._token_flushers.get(session_id)
+        if flusher is not None:
+            await flusher
+    
+    def _drop_tokens(self, session_id: str):
+        """Discard buffered tokens and stop flushing them.
+        
+        Args:
+            session_id: Session ID
+        """
+        self._token_buffers.pop(session_id, None)
+        flusher = self._token_flushers.pop(session_id, None)
+        if flusher is not None:
+            flusher.cancel()
+    
     async def broadcast_event(self, session_id: str, event_type: str, data: Any = None):
         """Broadcast an event to the WebSocket connection.
         
@@ -125,19 +180,27 @@ class WebSocketManager:
             "session_id": session_id
         })
     
-    async def prepare_session(self, session_id: str, initial_state: Dict[str, Any], graph: CompiledGraph):
+    async def prepare_session(
+        self,
+        session_id: str,
+        initial_state: Dict[str, Any],
+        graph: CompiledGraph,
+        config: Optional[RunnableConfig] = None
+    ):
         """Prepare a session for graph execution.
         
         Args:
             session_id: Session ID
             initial_state: Initial state for the graph
             graph: Compiled graph instance
+            config: Run config for the graph (carries the tool context)
         """
         self.sessions[session_id] = {
             "initial_state": initial_state,
             "graph": graph,
+            "config": config,
             "status": "prepared",
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": asyncio.get_running_loop().time()
         }
         logger.info(f"Session {session_id} prepared for execution")
     
@@ -172,9 +235,19 @@ class WebSocketManager:
             session_data["token_callback"] = token_callback
             session_data["event_callback"] = event_callback
             
+            # Stream LLM tokens to this session, coalescing bursts into single frames
+            config = session_data.get("config") or {}
+            config = {
+                **config,
+                "configurable": {
+                    **config.get("configurable", {}),
+                    "token_broadcaster": self.queue_token
+                }
+            }
+            
             # Execute the graph with streaming
             final_state = None
-            async for state in graph.astream(initial_state):
+            async for state in graph.astream(initial_state, config=config):
                 # Broadcast intermediate states
                 await self.broadcast_event(session_id, "state_update", {
                     "messages": [
@@ -187,6 +260,9 @@ class WebSocketManager:
                 })
                 final_state = state
             
+            # Let pending tokens go out before the final result
+            await self.wait_for_tokens(session_id)
+            
             # Broadcast final result
             if final_state:
                 final_messages = final_state.get("messages", [])
@@ -214,10 +290,10 @@ class WebSocketManager:
         Returns:
             Session status information or None if not found
         """
-        if session_id not in self.sessions:
+        session_data = self.sessions.get(session_id)
+        if session_data is None:
             return None
         
-        session_data = self.sessions[session_id]
         return {
             "session_id": session_id,
             "status": session_data.get("status", "unknown"),
@@ -234,17 +310,17 @@ class WebSocketManager:
         Returns:
             True if session was cleaned up, False if not found
         """
-        if session_id not in self.sessions:
+        # Remove session data
+        session_data = self.sessions.pop(session_id, None)
+        if session_data is None:
             return False
         
+        self._drop_tokens(session_id)
+        
         # Cancel any running tasks
-        session_data = self.sessions[session_id]
         if 'task' in session_data and not session_data['task'].done():
             session_data['task'].cancel()
         
-        # Remove session data
-        del self.sessions[session_id]
-        
         # Disconnect WebSocket if still connected
         if session_id in self.active_connections:
             try:
@@ -274,9 +350,68 @@ def get_websocket_manager() -> WebSocketManager:
     return _websocket_manager
 
 
+async def _serve_multiplexed(websocket: WebSocket, manager: WebSocketManager):
+    """Run chat sessions over one long-lived WebSocket connection.
+    
+    The client sends ``{"type": "start", "session_id": ...}`` for each
+    prepared session. Every streamed frame carries its session_id, so
+    consecutive turns share the connection instead of a new handshake each.
+    
+    Args:
+        websocket: WebSocket connection
+        manager: WebSocket manager
+    """
+    await websocket.accept()
+    running: Dict[str, asyncio.Task] = {}
+    
+    def finished(session_id: str):
+        running.pop(session_id, None)
+        manager.disconnect(session_id)
+    
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                logger.warning("Invalid JSON received on multiplexed WebSocket")
+                continue
+            
+            if not isinstance(message, dict):
+                logger.warning("Ignoring non-object frame on multiplexed WebSocket")
+                continue
+            
+            if message.get("type") == "ping":
+                await websocket.send_json({"type": "pong"})
+            
+            elif message.get("type") == "start":
+                session_id = message.get("session_id")
+                if session_id not in manager.sessions or session_id in running:
+                    await websocket.send_json({
+                        "type": "error",
+                        "error": "Session not found",
+                        "session_id": session_id
+                    })
+                    continue
+                
+                manager.active_connections[session_id] = websocket
+                task = asyncio.create_task(manager.execute_graph(session_id))
+                task.add_done_callback(lambda _, sid=session_id: finished(sid))
+                running[session_id] = task
+    
+    except WebSocketDisconnect:
+        logger.info("Multiplexed WebSocket disconnected")
+    
+    finally:
+        for task in list(running.values()):
+            task.cancel()
+
+
 async def websocket_endpoint(
     websocket: WebSocket,
-    session_id: str = Query(..., description="Session ID for the WebSocket connection")
+    session_id: Optional[str] = Query(
+        None,
+        description="Session ID for the WebSocket connection; omit to start sessions over the socket"
+    )
 ):
     """WebSocket endpoint for streaming tokens and events.
     
@@ -286,6 +421,10 @@ async def websocket_endpoint(
     """
     manager = get_websocket_manager()
     
+    if session_id is None:
+        await _serve_multiplexed(websocket, manager)
+        return
+    
     try:
         await manager.connect(websocket, session_id)
         
@@ -1,13 +1,13 @@
 """Telegram bot implementation using aiogram v3 with webhook and polling support."""
 
 import asyncio
-import json
 import logging
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import aiohttp
+import orjson
 from aiogram import Bot, Dispatcher, F
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
@@ -21,6 +21,7 @@ from aiogram.types import (
 )
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiohttp import web
+from yarl import URL
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
@@ -46,7 +47,13 @@ class TelegramBot:
             default=DefaultBotProperties(parse_mode=ParseMode.MARKDOWN)
         )
         self.dp = Dispatcher()
-        self.fastapi_base_url = f"http://localhost:8000"  # Configurable
+        
+        # Backend URLs are parsed once instead of on every request
+        base_url = URL(settings.fastapi_base_url)
+        self._health_url = base_url / "healthz"
+        self._chat_url = base_url / "chat/"
+        self._ingest_url = base_url / "ingest" / "pdf"
+        self._ws_url = URL(settings.fastapi_ws_url)
         
         # Setup handlers
         self._setup_handlers()
@@ -100,7 +107,7 @@ class TelegramBot:
             try:
                 # Check FastAPI health
                 async with aiohttp.ClientSession() as session:
-                    async with session.get(f"{self.fastapi_base_url}/healthz") as response:
+                    async with session.get(self._health_url) as response:
                         if response.status == 200:
                             health_data = await response.json()
                             status_text = (
@@ -159,7 +166,7 @@ class TelegramBot:
                 # Send to FastAPI ingestion endpoint
                 async with aiohttp.ClientSession() as session:
                     async with session.post(
-                        f"{self.fastapi_base_url}/ingest/pdf",
+                        self._ingest_url,
                         data=form_data
                     ) as response:
                         
@@ -206,7 +213,7 @@ class TelegramBot:
                 # Send message to FastAPI chat endpoint
                 async with aiohttp.ClientSession() as session:
                     async with session.post(
-                        f"{self.fastapi_base_url}/chat/",
+                        self._chat_url,
                         json={"message": user_text}
                     ) as response:
                         
@@ -253,43 +260,51 @@ class TelegramBot:
         """
         try:
             # Connect to WebSocket
-            ws_url = f"ws://localhost:8000/ws/stream?session_id={session_id}"
+            ws_url = self._ws_url.with_query(session_id=session_id)
             
-            accumulated_response = ""
+            chunks: List[str] = []  # Joined only when the message is edited
             last_update_time = 0
             update_interval = 0.5  # Update every 500ms
+            now = asyncio.get_running_loop().time
+            text_type, error_type = aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.ERROR
+            loads = orjson.loads
+            
+            # Partial edits run in the background so the socket keeps draining;
+            # at most one is in flight and terminal edits wait for it
+            pending_edit: Optional[asyncio.Task] = None
             
             async with aiohttp.ClientSession() as session:
                 async with session.ws_connect(ws_url) as ws:
                     
                     async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
+                        if msg.type is text_type:
                             try:
-                                data = json.loads(msg.data)
+                                data = loads(msg.data)
                                 msg_type = data.get('type')
                                 
                                 if msg_type == 'token':
                                     # Accumulate tokens
-                                    token = data.get('content', '')
-                                    accumulated_response += token
+                                    chunks.append(data.get('content', ''))
                                     
                                     # Update message every 500ms
-                                    current_time = asyncio.get_event_loop().time()
-                                    if current_time - last_update_time >= update_interval:
-                                        try:
-                                            await message.edit_text(
-                                                f"🤖 *AI Response:*\n\n{accumulated_response}..."
-                                            )
-                                            last_update_time = current_time
-                                        except Exception as edit_error:
-                                            # Handle rate limiting or other edit errors
-                                            logger.warning(f"Message edit error: {edit_error}")
+                                    current_time = now()
+                                    if (
+                                        current_time - last_update_time >= update_interval
+                                        and (pending_edit is None or pending_edit.done())
+                                    ):
+                                        pending_edit = asyncio.create_task(self._edit_partial(
+                                            message,
+                                            f"🤖 *AI Response:*\n\n{''.join(chunks)}..."
+                                        ))
+                                        last_update_time = current_time
                                 
                                 elif msg_type == 'final_result':
                                     # Final response
                                     result = data.get('result', {})
-                                    final_content = result.get('content', accumulated_response)
+                                    final_content = result.get('content', "".join(chunks))
                                     
+                                    if pending_edit is not None:
+                                        await pending_edit
                                     await message.edit_text(
                                         f"🤖 *AI Response:*\n\n{final_content}"
                                     )
@@ -298,16 +313,18 @@ class TelegramBot:
                                 elif msg_type == 'error':
                                     # Error occurred
                                     error_msg = data.get('error', 'Unknown error')
+                                    if pending_edit is not None:
+                                        await pending_edit
                                     await message.edit_text(
                                         f"❌ *Error:*\n\n{error_msg}"
                                     )
                                     break
                             
-                            except json.JSONDecodeError:
+                            except orjson.JSONDecodeError:
                                 logger.warning(f"Invalid JSON from WebSocket: {msg.data}")
                                 continue
                         
-                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                        elif msg.type is error_type:
                             logger.error(f"WebSocket error: {ws.exception()}")
                             break
         
@@ -318,6 +335,19 @@ class TelegramBot:
                 "The response was interrupted. Please try again."
             )
     
+    async def _edit_partial(self, message: Message, text: str):
+        """Show a partial streamed response, logging instead of raising.
+        
+        Args:
+            message: Telegram message to edit
+            text: Partial response text
+        """
+        try:
+            await message.edit_text(text)
+        except Exception as edit_error:
+            # Handle rate limiting or other edit errors
+            logger.warning(f"Message edit error: {edit_error}")
+    
     async def set_webhook(self) -> bool:
         """Set webhook for the bot.
         
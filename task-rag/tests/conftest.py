@@ -35,6 +35,7 @@ def test_settings() -> Settings:
             telegram_webhook_url="https://test.example.com",
             uploads_dir=temp_path / "uploads",
             chroma_dir=temp_path / "chroma",
+            tasks_db_path=temp_path / "tasks.db",
             model_name="gpt-3.5-turbo",
             embeddings_model="text-embedding-3-small",
             log_level="DEBUG",
@@ -95,7 +96,8 @@ def mock_langchain_openai():
 @pytest.fixture
 def mock_chroma():
     """Mock Chroma vector store."""
-    with patch('app.services.rag_service.Chroma') as mock_chroma_class:
+    with patch('app.services.rag_service.Chroma') as mock_chroma_class, \
+         patch('app.services.rag_service.chromadb'):
         mock_chroma_instance = MagicMock()
         
         # Mock collection
@@ -116,7 +118,6 @@ def mock_chroma():
             (MagicMock(page_content="Test content 2", metadata={'source': 'test.pdf'}), 0.8)
         ]
         mock_chroma_instance.as_retriever.return_value = MagicMock()
-        mock_chroma_instance.persist.return_value = None
         
         mock_chroma_class.return_value = mock_chroma_instance
         
@@ -125,8 +126,8 @@ def mock_chroma():
 
 @pytest.fixture
 def mock_pdf_loader():
-    """Mock PyPDFLoader."""
-    with patch('app.services.rag_service.PyPDFLoader') as mock_loader_class:
+    """Mock PyMuPDFLoader."""
+    with patch('app.services.rag_service.PyMuPDFLoader') as mock_loader_class:
         mock_loader_instance = MagicMock()
         mock_loader_instance.load.return_value = [
             MagicMock(
@@ -138,6 +139,7 @@ def mock_pdf_loader():
                 metadata={'source': 'test.pdf', 'page': 1}
             )
         ]
+        mock_loader_instance.lazy_load.side_effect = lambda: iter(mock_loader_instance.load.return_value)
         mock_loader_class.return_value = mock_loader_instance
         
         yield mock_loader_instance
@@ -148,7 +150,7 @@ def mock_text_splitter():
     """Mock RecursiveCharacterTextSplitter."""
     with patch('app.services.rag_service.RecursiveCharacterTextSplitter') as mock_splitter_class:
         mock_splitter_instance = MagicMock()
-        mock_splitter_instance.split_documents.return_value = [
+        chunks = [
             MagicMock(
                 page_content="This is chunk 1",
                 metadata={'source': 'test.pdf', 'page': 0, 'chunk': 0}
@@ -162,6 +164,11 @@ def mock_text_splitter():
                 metadata={'source': 'test.pdf', 'page': 1, 'chunk': 0}
             )
         ]
+        # Pages are split one at a time, so return only the chunks of the given pages
+        mock_splitter_instance.split_documents.side_effect = lambda docs: [
+            chunk for chunk in chunks
+            if chunk.metadata['page'] in {doc.metadata['page'] for doc in docs}
+        ]
         mock_splitter_class.return_value = mock_splitter_instance
         
         yield mock_splitter_instance
@@ -2,13 +2,20 @@
 
 import pytest
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from fastapi.testclient import TestClient
 from fastapi import UploadFile
 import io
 
-from app.services.rag_service import RAGService
-from app.utils.pdf import validate_pdf_file, safe_save_uploaded_file, get_pdf_metadata
+from app.services.rag_service import DELETE_BATCH_SIZE, RAGService, content_hash_of
+from app.utils.pdf import (
+    PDFValidationError,
+    get_pdf_metadata,
+    has_pdf_signature,
+    inspect_pdf_file,
+    safe_save_uploaded_file,
+    validate_pdf_file
+)
 
 
 class TestPDFValidation:
@@ -61,7 +68,7 @@ class TestPDFValidation:
     
     def test_safe_save_uploaded_file_success(self, test_settings, sample_pdf_content):
         """Test successful file saving."""
-        with patch('app.utils.pdf.validate_pdf_file', return_value=(True, None)):
+        with patch('app.utils.pdf.validate_pdf_stream', return_value=(True, None)):
             file_path = safe_save_uploaded_file(
                 file_content=sample_pdf_content,
                 filename="test.pdf",
@@ -72,9 +79,35 @@ class TestPDFValidation:
             assert file_path.name == "test.pdf"
             assert file_path.read_bytes() == sample_pdf_content
     
+    def test_safe_save_uploaded_file_name_clash(self, test_settings, sample_pdf_content):
+        """Test a second upload with the same name gets its own file."""
+        with patch('app.utils.pdf.validate_pdf_stream', return_value=(True, None)):
+            first = safe_save_uploaded_file(sample_pdf_content, "same.pdf", test_settings.uploads_dir)
+            second = safe_save_uploaded_file(b"%PDF-second", "same.pdf", test_settings.uploads_dir)
+        
+        assert first.name == "same.pdf"
+        assert second != first
+        assert second.name.startswith("same_") and second.suffix == ".pdf"
+        assert first.read_bytes() == sample_pdf_content
+        assert second.read_bytes() == b"%PDF-second"
+    
+    def test_safe_save_uploaded_file_from_file_object(self, test_settings, sample_pdf_content):
+        """Test saving an upload stream that has already been read."""
+        upload = io.BytesIO(sample_pdf_content)
+        upload.read()
+        
+        with patch('app.utils.pdf.validate_pdf_stream', return_value=(True, None)):
+            file_path = safe_save_uploaded_file(
+                file_content=upload,
+                filename="stream.pdf",
+                upload_dir=test_settings.uploads_dir
+            )
+            
+            assert file_path.read_bytes() == sample_pdf_content
+    
     def test_safe_save_uploaded_file_invalid_pdf(self, test_settings):
         """Test file saving with invalid PDF."""
-        with patch('app.utils.pdf.validate_pdf_file', return_value=(False, "Invalid PDF")):
+        with patch('app.utils.pdf.validate_pdf_stream', return_value=(False, "Invalid PDF")):
             with pytest.raises(Exception, match="Invalid PDF"):
                 safe_save_uploaded_file(
                     file_content=b"invalid content",
@@ -82,6 +115,25 @@ class TestPDFValidation:
                     upload_dir=test_settings.uploads_dir
                 )
     
+    def test_safe_save_uploaded_file_rejects_before_writing(self, test_settings):
+        """Test invalid content is rejected without touching the disk."""
+        with pytest.raises(PDFValidationError, match="PDF header"):
+            safe_save_uploaded_file(
+                file_content=b"invalid content",
+                filename="rejected.pdf",
+                upload_dir=test_settings.uploads_dir
+            )
+        
+        assert not (test_settings.uploads_dir / "rejected.pdf").exists()
+    
+    def test_has_pdf_signature(self, sample_pdf_content):
+        """Test PDF header detection rewinds the stream."""
+        pdf_stream = io.BytesIO(sample_pdf_content)
+        
+        assert has_pdf_signature(pdf_stream) is True
+        assert pdf_stream.tell() == 0
+        assert has_pdf_signature(io.BytesIO(b"Not a PDF")) is False
+    
     def test_get_pdf_metadata_success(self, test_settings, sample_pdf_content):
         """Test PDF metadata extraction."""
         pdf_path = test_settings.uploads_dir / "test.pdf"
@@ -100,6 +152,30 @@ class TestPDFValidation:
             assert metadata['file_size'] > 0
             assert 'title' in metadata
             assert 'author' in metadata
+    
+    def test_inspect_pdf_file_reads_real_pdf(self, test_settings, sample_pdf_content):
+        """Test a real PDF is validated and described through the memory map."""
+        pdf_path = test_settings.uploads_dir / "real.pdf"
+        pdf_path.write_bytes(sample_pdf_content)
+        
+        is_valid, error_msg, metadata = inspect_pdf_file(pdf_path)
+        
+        assert is_valid is True
+        assert error_msg is None
+        assert metadata['num_pages'] == 1
+        assert metadata['file_size'] == len(sample_pdf_content)
+        assert metadata['filename'] == "real.pdf"
+    
+    def test_inspect_pdf_file_rejects_non_pdf(self, test_settings):
+        """Test a file without a PDF header is rejected without metadata."""
+        pdf_path = test_settings.uploads_dir / "fake.pdf"
+        pdf_path.write_bytes(b"Not a PDF")
+        
+        is_valid, error_msg, metadata = inspect_pdf_file(pdf_path)
+        
+        assert is_valid is False
+        assert "PDF header" in error_msg
+        assert metadata == {}
 
 
 class TestRAGService:
@@ -153,6 +229,66 @@ class TestRAGService:
             with pytest.raises(ValueError, match="No content could be extracted"):
                 rag_service.process_pdf(pdf_path)
     
+    @pytest.mark.asyncio
+    async def test_aprocess_pdf_success(self, rag_service, test_settings, sample_pdf_content,
+                                        mock_pdf_loader, mock_text_splitter, mock_chroma):
+        """Test async PDF processing embeds each batch and writes it to the collection."""
+        pdf_path = test_settings.uploads_dir / "test.pdf"
+        pdf_path.write_bytes(sample_pdf_content)
+        # The service built its splitter before the fixture patched the class
+        rag_service.text_splitter = mock_text_splitter
+        rag_service.settings.embedding_batch_size = 2
+        rag_service.embeddings.aembed_documents = AsyncMock(
+            side_effect=lambda texts: [[0.1] * 1536 for _ in texts]
+        )
+        
+        with patch('app.services.rag_service.inspect_pdf_file',
+                   return_value=(True, None, {'num_pages': 2, 'file_size': 1024})):
+            result = await rag_service.aprocess_pdf(pdf_path)
+        
+        assert result['document_count'] == 2
+        assert result['chunk_count'] == 3
+        assert len(result['chunk_ids']) == 3
+        assert rag_service.embeddings.aembed_documents.await_count == 2
+        assert mock_chroma._collection.upsert.call_count == 2
+        expected_ids = sorted(content_hash_of(f"This is chunk {i}") for i in (1, 2, 3))
+        upserted_ids = [
+            chunk_id
+            for call in mock_chroma._collection.upsert.call_args_list
+            for chunk_id in call.kwargs['ids']
+        ]
+        assert sorted(upserted_ids) == expected_ids
+        assert sorted(result['chunk_ids']) == expected_ids
+    
+    @pytest.mark.asyncio
+    async def test_aprocess_pdf_skips_stored_chunks(self, rag_service, test_settings, sample_pdf_content,
+                                                    mock_pdf_loader, mock_text_splitter, mock_chroma):
+        """Test re-ingesting a PDF does not embed chunks already in the collection."""
+        pdf_path = test_settings.uploads_dir / "test.pdf"
+        pdf_path.write_bytes(sample_pdf_content)
+        # The service built its splitter before the fixture patched the class
+        rag_service.text_splitter = mock_text_splitter
+        rag_service.embeddings.aembed_documents = AsyncMock()
+        mock_chroma._collection.get.side_effect = lambda ids, include: {'ids': ids}
+        
+        with patch('app.services.rag_service.inspect_pdf_file',
+                   return_value=(True, None, {'num_pages': 2, 'file_size': 1024})):
+            result = await rag_service.aprocess_pdf(pdf_path)
+        
+        assert result['chunk_count'] == 0
+        assert result['duplicate_count'] == 3
+        looked_up_ids = [
+            chunk_id
+            for call in mock_chroma._collection.get.call_args_list
+            for chunk_id in call.kwargs['ids']
+        ]
+        assert sorted(looked_up_ids) == sorted(
+            content_hash_of(f"This is chunk {i}") for i in (1, 2, 3)
+        )
+        rag_service.embeddings.aembed_documents.assert_not_awaited()
+        mock_chroma._collection.upsert.assert_not_called()
+        mock_chroma.add_documents.assert_not_called()
+    
     def test_get_retriever(self, rag_service, mock_chroma):
         """Test retriever creation."""
         retriever = rag_service.get_retriever(k=3)
@@ -197,7 +333,9 @@ class TestRAGService:
         success = rag_service.delete_documents_by_source(source)
         
         assert success is True
-        mock_chroma._collection.get.assert_called_once_with(where={"source": source})
+        mock_chroma._collection.get.assert_called_once_with(
+            where={"source": source}, limit=DELETE_BATCH_SIZE, include=[]
+        )
         mock_chroma._collection.delete.assert_called_once()
     
     def test_clear_collection(self, rag_service, mock_chroma):
@@ -224,14 +362,14 @@ class TestIngestRoutes:
             
             # Mock RAG service
             mock_rag_service = MagicMock()
-            mock_rag_service.process_pdf.return_value = {
+            mock_rag_service.aprocess_pdf = AsyncMock(return_value={
                 'success': True,
                 'filename': 'test.pdf',
                 'document_count': 2,
                 'chunk_count': 3,
                 'chunk_ids': ['1', '2', '3'],
                 'metadata': {'num_pages': 2}
-            }
+            })
             mock_get_rag.return_value = mock_rag_service
             
             # Create test file
@@ -273,7 +411,7 @@ class TestIngestRoutes:
             
             # Mock RAG service to raise error
             mock_rag_service = MagicMock()
-            mock_rag_service.process_pdf.side_effect = Exception("Processing failed")
+            mock_rag_service.aprocess_pdf = AsyncMock(side_effect=Exception("Processing failed"))
             mock_get_rag.return_value = mock_rag_service
             
             files = {"file": ("test.pdf", io.BytesIO(sample_pdf_content), "application/pdf")}
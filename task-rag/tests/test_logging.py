@@ -0,0 +1,61 @@
+"""Tests for buffered, rotating log file handling."""
+
+import logging
+import queue
+
+from app.utils.logging import PruningRotatingFileHandler, _DrainFlushingQueueListener
+
+
+def make_record(i: int) -> logging.LogRecord:
+    """Build an INFO record with a numbered message."""
+    return logging.LogRecord("test", logging.INFO, __file__, 1, "record %d", (i,), None)
+
+
+class TestPruningRotatingFileHandler:
+    """Test the buffered rotating file handler."""
+    
+    def test_records_stay_buffered_until_queue_drains(self, tmp_path):
+        """Test records reach the file only when the listener finds the queue empty."""
+        log_path = tmp_path / "app.log"
+        handler = PruningRotatingFileHandler(
+            log_path,
+            maxBytes=10 * 1024 * 1024,
+            backupCount=2,
+            encoding='utf-8',
+            delay=True
+        )
+        listener = _DrainFlushingQueueListener(queue.Queue(), handler)
+        
+        try:
+            for i in range(99):
+                handler.handle(make_record(i))
+            
+            assert log_path.stat().st_size == 0
+            
+            listener.handle(make_record(99))
+            
+            assert log_path.read_text(encoding='utf-8').count("record") == 100
+        finally:
+            handler.close()
+    
+    def test_rollover_keeps_backup_count(self, tmp_path):
+        """Test size rollover renames the active file and prunes old backups."""
+        log_path = tmp_path / "app.log"
+        handler = PruningRotatingFileHandler(
+            log_path,
+            maxBytes=64,
+            backupCount=2,
+            encoding='utf-8',
+            delay=True
+        )
+        
+        try:
+            for i in range(20):
+                handler.handle(make_record(i))
+            handler.flush_buffer()
+        finally:
+            handler.close()
+        
+        backups = [p for p in tmp_path.iterdir() if p.name.startswith("app.log.")]
+        assert len(backups) == 2
+        assert log_path.stat().st_size <= 64
@@ -1,10 +1,12 @@
 """Tests for retrieval and search functionality."""
 
+import asyncio
+
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from langchain_core.documents import Document
 
-from app.services.rag_service import RAGService
+from app.services.rag_service import DELETE_BATCH_SIZE, QueryEmbeddingBatcher, RAGService
 from app.graph.tools import retriever_tool
 from app.graph.state import AgentState
 
@@ -104,7 +106,9 @@ class TestDocumentManagement:
         success = rag_service.delete_documents_by_source(source)
         
         assert success is True
-        mock_chroma._collection.get.assert_called_once_with(where={"source": source})
+        mock_chroma._collection.get.assert_called_once_with(
+            where={"source": source}, limit=DELETE_BATCH_SIZE, include=[]
+        )
         mock_chroma._collection.delete.assert_called_once_with(ids=['1', '2', '3'])
     
     def test_delete_documents_by_source_not_found(self, rag_service, mock_chroma):
@@ -277,11 +281,21 @@ class TestRAGPerformance:
     
     def test_retriever_caching_behavior(self, rag_service, mock_chroma):
         """Test retriever caching behavior."""
+        # Hand out a distinct retriever per call, like Chroma does
+        mock_chroma.as_retriever.side_effect = (
+            lambda **kwargs: MagicMock(search_kwargs=kwargs["search_kwargs"])
+        )
+        
         # Get retriever multiple times
         retriever1 = rag_service.get_retriever(k=5)
         retriever2 = rag_service.get_retriever(k=5)
         
-        # Should create new retriever each time (no caching in current implementation)
+        retriever3 = rag_service.get_retriever(k=3)
+        
+        # Retrievers are cached per k
+        assert retriever1 is retriever2
+        assert retriever3 is not retriever1
+        assert retriever3.search_kwargs["k"] == 3
         assert mock_chroma.as_retriever.call_count == 2
     
     def test_memory_efficient_search(self, rag_service, mock_chroma):
@@ -299,6 +313,23 @@ class TestRAGPerformance:
         
         # Should handle all queries without issues
         assert mock_chroma.similarity_search.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_embedding_request(self):
+        """Test concurrent query embeddings are coalesced into a single request."""
+        embeddings = MagicMock()
+        embeddings.aembed_documents = AsyncMock(
+            side_effect=lambda texts: [[float(len(text))] for text in texts]
+        )
+        batcher = QueryEmbeddingBatcher(embeddings, max_wait=0.01)
+        
+        results = await asyncio.gather(
+            batcher.embed(["a"]),
+            batcher.embed(["bb", "ccc"])
+        )
+        
+        assert results == [[[1.0]], [[2.0], [3.0]]]
+        embeddings.aembed_documents.assert_awaited_once_with(["a", "bb", "ccc"])
 
 
 class TestRAGErrorRecovery:
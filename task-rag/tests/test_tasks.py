@@ -1,14 +1,20 @@
 """Tests for task CRUD operations and LangGraph tool integration."""
 
 import pytest
+import sqlite3
 from datetime import datetime, date
 from unittest.mock import patch, MagicMock, AsyncMock
 from uuid import uuid4
 
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
 from app.models.task import Task, TaskStatus
+from app.routes import tasks as task_routes
 from app.services.task_service import TaskService
+from app.services.task_store import TaskStore
 from app.schemas import TaskCreate, TaskUpdate
-from app.graph.tools import task_create_tool, task_update_tool, task_list_tool
+from app.graph.tools import ToolContext, task_create_tool, task_update_tool, task_list_tool
 
 
 class TestTaskModel:
@@ -84,7 +90,7 @@ class TestTaskService:
         assert task.title == "Test Task"
         assert task.description == "Test description"
         assert task.status == TaskStatus.PENDING
-        assert task.id in task_service._tasks
+        assert task.id.int in task_service._tasks
     
     def test_create_task_minimal(self, task_service):
         """Test task creation with minimal data."""
@@ -182,7 +188,7 @@ class TestTaskService:
         success = task_service.delete_task(task.id)
         
         assert success is True
-        assert task.id not in task_service._tasks
+        assert task.id.int not in task_service._tasks
         assert task_service.get_task(task.id) is None
     
     def test_delete_task_not_found(self, task_service):
@@ -257,6 +263,63 @@ class TestTaskService:
         beyond_tasks = task_service.list_tasks(offset=10)
         assert len(beyond_tasks) == 0
     
+    def test_list_tasks_status_page_is_newest_first(self, task_service):
+        """Test a paginated status listing returns the newest matching tasks."""
+        tasks = [task_service.create_task(f"Task {i}") for i in range(5)]
+        
+        page = task_service.list_tasks(status=TaskStatus.PENDING, limit=2, offset=1)
+        
+        assert [t.id for t in page] == [tasks[3].id, tasks[2].id]
+    
+    def test_list_tasks_status_pages_break_timestamp_ties(self, task_service):
+        """Test status pages stay in creation order when timestamps are equal."""
+        with patch('app.services.task_service.utcnow', return_value=datetime(2024, 1, 1)):
+            tasks = [task_service.create_task(f"Task {i}") for i in range(5)]
+        
+        pages = [
+            task_service.list_tasks(status=TaskStatus.PENDING, limit=2, offset=offset)
+            for offset in (0, 2, 4)
+        ]
+        
+        assert [t.id for page in pages for t in page] == [t.id for t in reversed(tasks)]
+    
+    def test_tasks_persist_across_restarts(self, tmp_path):
+        """Test tasks written through a task store are restored by a new service."""
+        db_path = tmp_path / "tasks.db"
+        service = TaskService(TaskStore(db_path))
+        kept = service.create_task("Kept", "Survives restart")
+        service.update_task_status(kept.id, TaskStatus.COMPLETED)
+        dropped = service.create_task("Dropped")
+        service.delete_task(dropped.id)
+        service.close()
+        
+        restored = TaskService(TaskStore(db_path))
+        
+        task = restored.get_task(kept.id)
+        assert task.title == "Kept"
+        assert task.status == TaskStatus.COMPLETED
+        assert restored.get_task(dropped.id) is None
+        assert restored.get_task_count(status=TaskStatus.COMPLETED) == 1
+        restored.close()
+    
+    def test_task_store_retries_failed_flush(self, tmp_path):
+        """Test changes from a failed flush are written by the next one."""
+        db_path = tmp_path / "tasks.db"
+        store = TaskStore(db_path, flush_interval=3600)
+        service = TaskService(store)
+        kept = service.create_task("Kept")
+        
+        real_conn = store._conn
+        store._conn = MagicMock(wraps=real_conn)
+        store._conn.executemany.side_effect = sqlite3.OperationalError("disk I/O error")
+        store.flush()
+        store._conn = real_conn
+        service.close()
+        
+        restored = TaskService(TaskStore(db_path))
+        assert restored.get_task(kept.id).title == "Kept"
+        restored.close()
+    
     def test_get_task_count(self, task_service):
         """Test task counting."""
         assert task_service.get_task_count() == 0
@@ -285,6 +348,24 @@ class TestTaskService:
         assert counts[TaskStatus.COMPLETED] == 1
         assert counts[TaskStatus.CANCELLED] == 0
     
+    def test_status_index_follows_updates_and_deletes(self, task_service):
+        """Test status counts and filters stay correct as tasks change status or go away."""
+        task1 = task_service.create_task("Task 1")
+        task2 = task_service.create_task("Task 2")
+        task3 = task_service.create_task("Task 3")
+        
+        task_service.update_task(task1.id, TaskUpdate(status=TaskStatus.COMPLETED))
+        task_service.update_task_status(task2.id, TaskStatus.COMPLETED)
+        task_service.delete_task(task2.id)
+        
+        assert task_service.get_task_count(status=TaskStatus.PENDING) == 1
+        assert task_service.get_task_count(status=TaskStatus.COMPLETED) == 1
+        assert [t.id for t in task_service.list_tasks(status=TaskStatus.COMPLETED)] == [task1.id]
+        assert [t.id for t in task_service.list_tasks(status=TaskStatus.PENDING)] == [task3.id]
+        
+        task_service.clear_all_tasks()
+        assert task_service.get_task_count(status=TaskStatus.PENDING) == 0
+    
     def test_search_tasks_success(self, task_service):
         """Test successful task search."""
         task1 = task_service.create_task("Project planning", "Plan the new project")
@@ -323,6 +404,17 @@ class TestTaskService:
         results = task_service.search_tasks("test", limit=3)
         assert len(results) == 3
     
+    def test_search_tasks_after_update(self, task_service):
+        """Test search reflects renamed tasks and ranks title matches first."""
+        task1 = task_service.create_task("Draft notes", "Mention the Budget")
+        task2 = task_service.create_task("Old name")
+        
+        task_service.update_task(task2.id, TaskUpdate(title="Budget review"))
+        
+        results = task_service.search_tasks("budget")
+        assert [t.id for t in results] == [task2.id, task1.id]
+        assert task_service.search_tasks("old name") == []
+    
     def test_bulk_create_tasks(self, task_service):
         """Test bulk task creation."""
         tasks_data = [
@@ -347,6 +439,20 @@ class TestTaskService:
         assert created_tasks == []
         assert task_service.get_task_count() == 0
     
+    def test_bulk_create_tasks_skips_blank_titles(self, task_service):
+        """Test bulk task creation skips titles that are blank after stripping."""
+        tasks_data = [
+            TaskCreate(title="  Valid Task  "),
+            TaskCreate(title="   "),
+        ]
+        
+        created_tasks = task_service.bulk_create_tasks(tasks_data)
+        
+        assert len(created_tasks) == 1
+        assert created_tasks[0].title == "Valid Task"
+        assert created_tasks[0].status == TaskStatus.PENDING
+        assert task_service.get_task_count() == 1
+    
     def test_bulk_create_tasks_with_errors(self, task_service):
         """Test bulk task creation with some invalid tasks."""
         tasks_data = [
@@ -404,8 +510,8 @@ class TestTaskService:
         
         assert stats['total_tasks'] == 3
         assert stats['completion_rate'] == 66.67  # 2/3 * 100, rounded
-        assert stats['oldest_task']['id'] == str(task1.id)
-        assert stats['newest_task']['id'] == str(task3.id)
+        assert stats['oldest_task']['id'] == task1.id
+        assert stats['newest_task']['id'] == task3.id
         assert TaskStatus.COMPLETED in stats['status_counts']
         assert stats['status_counts'][TaskStatus.COMPLETED] == 2
 
@@ -529,6 +635,19 @@ class TestLangGraphToolIntegration:
             assert "Error creating task" in result
             assert "Creation failed" in result
     
+    def test_task_create_tool_splits_title_and_description(self):
+        """Test the first sentence becomes the title and the rest the description."""
+        mock_service = MagicMock()
+        task_create_tool.invoke(
+            {"text": "Buy milk. Get the oat kind. Before Friday."},
+            config={"configurable": {"tool_ctx": ToolContext(task_service=mock_service)}}
+        )
+        
+        mock_service.create_task.assert_called_once_with(
+            title="Buy milk",
+            description="Get the oat kind. Before Friday."
+        )
+    
     @pytest.mark.asyncio
     async def test_task_update_tool_success(self):
         """Test successful task update via LangGraph tool."""
@@ -838,4 +957,26 @@ class TestTaskRoutes:
             data = response.json()
             assert data['total_tasks'] == 10
             assert data['completion_rate'] == 60.0
+    
+    def test_get_task_statistics_serializes_real_service(self):
+        """Test the statistics endpoint encodes a real service's statistics."""
+        service = TaskService()
+        done_task = service.create_task("Done task")
+        service.create_task("Open task")
+        service.update_task_status(done_task.id, TaskStatus.COMPLETED)
+        
+        # Serve just the task routes, overriding the dependency they resolve
+        app = FastAPI()
+        app.include_router(task_routes.router)
+        app.dependency_overrides[task_routes.get_task_service] = lambda: service
+        
+        response = TestClient(app).get("/tasks/stats/")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data['total_tasks'] == 2
+        assert data['status_counts'] == {
+            'pending': 1, 'in_progress': 0, 'completed': 1, 'cancelled': 0
+        }
+        assert data['newest_task']['title'] == "Open task"
 